@@ -23,10 +23,15 @@
 import _thread
 import time
 import argparse
+import asyncio
+import atexit
 import array
 import code
+import codecs
+import collections
 import errno
 import fcntl
+import io
 import os
 import pty
 import select
@@ -36,10 +41,13 @@ import stat
 import sys
 import termios
 import tty
-import queue
-import string
-import random
+import types
+import re
 import cmd
+from typing import Final
+
+# Keyboard scancode mappings, edit them in scancode_dictionaries.py
+from scancode_dictionaries import ESC, scancodeDictionaries
 
 # Some important default parameters
 
@@ -66,970 +74,219 @@ DEFAULT_CODEPAGE = 'cp037'
 # Default state for advanced features
 DEFAULT_FEATURES = False
 
-# Scancode lookup tables
-# Format is the scancode as a key and a 4 or 5 sized array:
-# SCANCODE: [POS0, POS1, POS2, POS3, POS4]
-# Position 0: Normal key
-# Position 1: Shift + key
-# Position 2: Alt + key
-# Position 3: Ctrl + key
-# Position 4 (optional): Extra char to send when the first char resolves to
-#                        ESC (0x1B)
-# Position 5 (optional): When the EXTRA scancode is received before the given
-#                        scancode, send 0x1B plus this char
-
-scancodeDictionaries = {
-
-    '5250_ES': {
-
-        # SPECIAL KEYS MAPPINGS
-        'CTRL_PRESS': [0x54],
-        'CTRL_RELEASE': [0xD4],
-        'ALT_PRESS': [0x68],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x57, 0x56],
-        'SHIFT_RELEASE': [0xD7, 0xD6],
-        'CAPS_LOCK': [0x7E],
-        'EXTRA': [],
-
-        # FUNCTION BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x7C: [chr(0x1B), chr(0x1B), '', ''],  # F1 as ESC
-        0x6F: [chr(0x1B), chr(0x1B), '', ''],  # F2 as ESC
-        # ROW 2
-        0x6C: ['', '', '', ''],  # F3
-        0x6D: ['', '', '', ''],  # F4
-        # ROW 3
-        0x6E: ['', '', '', ''],  # F5
-        0x7D: ['', '', '', ''],  # F6
-        # ROW 4
-        0x71: ['', '', '', ''],  # F7
-        0x70: ['', '', '', ''],  # F8
-        # ROW 5
-        0x72: ['', '', '', ''],  # F9
-        0x73: ['', '', '', ''],  # F10
-
-        # MAIN ALPHA AND NUMPAD BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x3E: ['º', 'ª', '\\', ''],
-        0x31: ['1', '!', '|', ''],
-        0x32: ['2', '"', '@', ''],
-        0x33: ['3', '·', '#', ''],
-        0x34: ['4', '$', '~', ''],
-        0x35: ['5', '%', '½', ''],
-        0x36: ['6', '&', '', ''],
-        0x37: ['7', '/', '', ''],
-        0x38: ['8', '(', '', ''],
-        0x39: ['9', ')', '', ''],
-        0x3A: ['0', '=', '', ''],
-        0x3B: ['\'', '?', '', chr(0x1C)],
-        0x3C: ['¡', '¿', '', ''],
-        0x3D: [chr(0x08), chr(0x08), '', ''],  # BS
-        0x4B: ['', '', '', ''],
-        0x4C: ['', '', '', ''],  # DUP
-        # ROW 2
-        0x20: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x21: ['q', 'Q', '', chr(0x11)],
-        0x22: ['w', 'W', '', chr(0x17)],
-        0x23: ['e', 'E', '', chr(0x05)],
-        0x24: ['r', 'R', '', chr(0x12)],
-        0x25: ['t', 'T', '', chr(0x14)],
-        0x26: ['y', 'Y', '', chr(0x19)],
-        0x27: ['u', 'U', '', chr(0x15)],
-        0x28: ['i', 'I', '', chr(0x09)],
-        0x29: ['o', 'O', '', chr(0x0F)],
-        0x2A: ['p', 'P', '', chr(0x10)],
-        0x2B: ['`', '^', '[', chr(0x1B)],
-        0x2C: ['+', '*', ']', chr(0x1D)],
-        0x2D: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        0x47: ['7', '7', '', ''],
-        0x48: ['8', '8', chr(0x1B), chr(0x1B), 'A'],  # NUMPAD 8 and UP ARROW
-        0x49: ['9', '9', '', ''],
-        0x4E: ['', '', '', ''],  # CAMPO-
-        # ROW 3
-        # 0x54: ['', '', ''], #SHIFT
-        0x11: ['a', 'A', '', chr(0x01)],
-        0x12: ['s', 'S', '', chr(0x13)],
-        0x13: ['d', 'D', '', chr(0x04)],
-        0x14: ['f', 'F', '', chr(0x06)],
-        0x15: ['g', 'G', '', chr(0x07)],
-        0x16: ['h', 'H', '', chr(0x08)],
-        0x17: ['j', 'J', '', chr(0x0A)],
-        0x18: ['k', 'K', '', chr(0x0B)],
-        0x19: ['l', 'L', '', chr(0x0C)],
-        0x1A: ['ñ', 'Ñ', '', ''],
-        0x1B: ['´', '¨', '{', chr(0x1B)],
-        0x1C: ['ç', 'Ç', '}', chr(0x1D)],
-        0x44: ['4', '4', chr(0x1B), chr(0x1B), 'D'],  # NUMPAD 4 and LEFT ARROW
-        0x45: ['5', '5', '', ''],
-        # NUMPAD 6 and RIGHT ARROW
-        0x46: ['6', '6', chr(0x1B), chr(0x1B), 'C'],
-        0x4D: [chr(0x0D), '', '', ''],  # ENTER
-        # ROW 4
-        # 0x57: ['', '', ''], #CTRL
-        0x0E: ['<', '>', '|', ''],
-        0x01: ['z', 'Z', '', chr(0x1A)],
-        0x02: ['x', 'X', '', chr(0x18)],
-        0x03: ['c', 'C', '', chr(0x03)],
-        0x04: ['v', 'V', '', chr(0x16)],
-        0x05: ['b', 'B', '', chr(0x02)],
-        0x06: ['n', 'N', '', chr(0x0E)],
-        0x07: ['m', 'M', '', chr(0x0D)],
-        0x08: [',', ';', '', ''],
-        0x09: ['.', ':', '', ''],
-        0x0A: ['-', '_', '', chr(0x1F)],
-        # 0x56: ['', '', ''], #ALT
-        0x0C: ['', '', '', ''],
-        0x41: ['1', '1', '', ''],
-        0x42: ['2', '2', chr(0x1B), chr(0x1B), 'B'],  # NUMPAD 2 and DOWN ARROW
-        0x43: ['3', '3', '', ''],
-        0x68: ['', '', '', ''],
-        0x40: ['0', '0', '', ''],
-        0x4A: [',', '', '', ''],
-        # ROW 5
-        0x0F: [' ', ' ', '', ''],  # SPACE BAR
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-            '[': 0x4A,
-            ']': 0x5A,
-            '^': 0x95,
-            '#': 0xBC
-        },
-    },
-
-    '5250_US': {
-
-        # SPECIAL KEYS MAPPINGS
-        'CTRL_PRESS': [0x54],
-        'CTRL_RELEASE': [0xD4],
-        'ALT_PRESS': [0x68],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x57, 0x56],
-        'SHIFT_RELEASE': [0xD7, 0xD6],
-        'CAPS_LOCK': [0x7E],
-        'EXTRA': [],
-
-        # FUNCTION BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x7C: [chr(0x1B), chr(0x1B), '', ''],  # F1 as ESC
-        0x6F: [chr(0x1B), chr(0x1B), '', ''],  # F2 as ESC
-        # ROW 2
-        # 0x6C: ['', '', '', ''], #F3
-        # 0x6D: ['', '', '', ''], #F4
-        # ROW 3
-        # 0x6E: ['', '', '', ''], #F5
-        # 0x7D: ['', '', '', ''], #F6
-        # ROW 4
-        # 0x71: ['', '', '', ''], #F7
-        # 0x70: ['', '', '', ''], #F8
-        # ROW 5
-        # 0x72: ['', '', '', ''], #F9
-        # 0x73: ['', '', '', ''], #F10
-
-        # MAIN ALPHA AND NUMPAD BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x3E: ['`', '~', '`', ''],
-        0x31: ['1', '|', '', ''],
-        0x32: ['2', '@', '', ''],
-        0x33: ['3', '#', '', ''],
-        0x34: ['4', '$', '', ''],
-        0x35: ['5', '%', '', ''],
-        0x36: ['6', '^', '', ''],
-        0x37: ['7', '&', '', ''],
-        0x38: ['8', '*', '', ''],
-        0x39: ['9', '(', '', ''],
-        0x3A: ['0', ')', '', ''],
-        0x3B: ['-', '_', '', chr(0x1C)],
-        0x3C: ['=', '+', '', ''],
-        0x3D: [chr(0x08), chr(0x08), '', ''],  # BS
-        0x4B: ['', '', '', ''],
-        0x4C: ['', '', '', ''],  # DUP
-        # ROW 2
-        0x20: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x21: ['q', 'Q', '', chr(0x11)],
-        0x22: ['w', 'W', '', chr(0x17)],
-        0x23: ['e', 'E', '', chr(0x05)],
-        0x24: ['r', 'R', '', chr(0x12)],
-        0x25: ['t', 'T', '', chr(0x14)],
-        0x26: ['y', 'Y', '', chr(0x19)],
-        0x27: ['u', 'U', '', chr(0x15)],
-        0x28: ['i', 'I', '', chr(0x09)],
-        0x29: ['o', 'O', '', chr(0x0F)],
-        0x2A: ['p', 'P', '', chr(0x10)],
-        0x2B: ['¢', '!', '', chr(0x1B)],
-        0x2C: ['\\', '|', '', chr(0x1D)],
-        0x2D: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        0x47: ['7', '7', '', ''],
-        0x48: ['8', '8', chr(0x1B), chr(0x1B), 'A'],  # NUMPAD 8 and UP ARROW
-        0x49: ['9', '9', '', ''],
-        0x4E: ['', '', '', ''],  # CAMPO-
-        # ROW 3
-        # 0x54 ['', '', ''], #SHIFT
-        0x11: ['a', 'A', '', chr(0x01)],
-        0x12: ['s', 'S', '', chr(0x13)],
-        0x13: ['d', 'D', '', chr(0x04)],
-        0x14: ['f', 'F', '', chr(0x06)],
-        0x15: ['g', 'G', '', chr(0x07)],
-        0x16: ['h', 'H', '', chr(0x08)],
-        0x17: ['j', 'J', '', chr(0x0A)],
-        0x18: ['k', 'K', '', chr(0x0B)],
-        0x19: ['l', 'L', '', chr(0x0C)],
-        0x1A: [';', ':', '', ''],
-        0x1B: ['\'', '""', '', chr(0x1B)],
-        0x1C: ['{', '}', '', chr(0x1D)],
-        0x44: ['4', '4', chr(0x1B), chr(0x1B), 'D'],  # NUMPAD 4 and LEFT ARROW
-        0x45: ['5', '5', '', ''],
-        # NUMPAD 6 and RIGHT ARROW
-        0x46: ['6', '6', chr(0x1B), chr(0x1B), 'C'],
-        0x4D: [chr(0x0D), '', '', ''],  # ENTER
-        # ROW 4
-        # 0x57: ['', '', ''], #CTRL
-        0x0E: ['<', '>', '|', ''],
-        0x01: ['z', 'Z', '', chr(0x1A)],
-        0x02: ['x', 'X', '', chr(0x18)],
-        0x03: ['c', 'C', '', chr(0x03)],
-        0x04: ['v', 'V', '', chr(0x16)],
-        0x05: ['b', 'B', '', chr(0x02)],
-        0x06: ['n', 'N', '', chr(0x0E)],
-        0x07: ['m', 'M', '', chr(0x0D)],
-        0x08: [',', '<', '', ''],
-        0x09: ['.', '>', '', ''],
-        0x0A: ['/', '?', '', chr(0x1F)],
-        # 0x56: ['', '', ''], #ALT
-        0x0C: ['', '', '', ''],
-        0x41: ['1', '1', '', ''],
-        0x42: ['2', '2', chr(0x1B), chr(0x1B), 'B'],  # NUMPAD 2 and DOWN ARROW
-        0x43: ['3', '3', '', ''],
-        0x68: ['', '', '', ''],
-        0x40: ['0', '0', '', ''],
-        0x4A: [',', '', '', ''],
-        # ROW 5
-        0x0F: [' ', ' ', '', ''],  # SPACE BAR
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-        },
-    },
-
-    '5250_DE': {
-
-        # SPECIAL KEYS MAPPINGS
-        'CTRL_PRESS': [0x54],
-        'CTRL_RELEASE': [0xD4],
-        'ALT_PRESS': [0x68],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x57, 0x56],
-        'SHIFT_RELEASE': [0xD7, 0xD6],
-        'CAPS_LOCK': [0x7E],
-        'EXTRA': [],
-
-        # FUNCTION BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x7C: [chr(0x1B), chr(0x1B), '', ''],  # F1 as ESC
-        0x6F: [chr(0x1B), chr(0x1B), '', ''],  # F2 as ESC
-        # ROW 2
-        # 0x6C: ['', '', '', ''], #F3
-        # 0x6D: ['', '', '', ''], #F4
-        # ROW 3
-        # 0x6E: ['', '', '', ''], #F5
-        # 0x7D: ['', '', '', ''], #F6
-        # ROW 4
-        # 0x71: ['', '', '', ''], #F7
-        # 0x70: ['', '', '', ''], #F8
-        # ROW 5
-        # 0x72: ['', '', '', ''], #F9
-        # 0x73: ['', '', '', ''], #F10
-
-        # MAIN ALPHA AND NUMPAD BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x3E: ['^', '°', '′', ''],
-        0x31: ['1', '!', '¹', ''],
-        0x32: ['2', '"', '²', ''],
-        0x33: ['3', '§', '³', ''],
-        0x34: ['4', '$', '¼', ''],
-        0x35: ['5', '%', '½', ''],
-        0x36: ['6', '&', '¬', ''],
-        0x37: ['7', '/', '{', ''],
-        0x38: ['8', '(', '[', ''],
-        0x39: ['9', ')', ']', ''],
-        0x3A: ['0', '=', '}', ''],
-        0x3B: ['ß', '?', '\\', chr(0x1C)],
-        0x3C: ['´', '`', '¸', ''],
-        0x3D: [chr(0x08), chr(0x08), '', ''],  # BS
-        0x4B: ['', '', '', ''],
-        0x4C: ['', '', '', ''],  # DUP
-        # ROW 2
-        0x20: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x21: ['q', 'Q', '@', chr(0x11)],
-        0x22: ['w', 'W', 'ł', chr(0x17)],
-        0x23: ['e', 'E', '€', chr(0x05)],
-        0x24: ['r', 'R', '¶', chr(0x12)],
-        0x25: ['t', 'T', 'ŧ', chr(0x14)],
-        0x26: ['z', 'Z', '←', chr(0x19)],
-        0x27: ['u', 'U', '↓', chr(0x15)],
-        0x28: ['i', 'I', '→', chr(0x09)],
-        0x29: ['o', 'O', 'ø', chr(0x0F)],
-        0x2A: ['p', 'P', 'þ', chr(0x10)],
-        0x2B: ['ü', 'Ü', '¨', chr(0x1B)],
-        0x2C: ['+', '*', '~', chr(0x1D)],
-        0x2D: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        0x47: ['7', '7', '', ''],
-        0x48: ['8', '8', chr(0x1B), chr(0x1B), 'A'],  # NUMPAD 8 and UP ARROW
-        0x49: ['9', '9', '', ''],
-        0x4E: ['', '', '', ''],  # CAMPO-
-        # ROW 3
-        # 0x54: ['', '', ''], #SHIFT
-        0x11: ['a', 'A', 'æ', chr(0x01)],
-        0x12: ['s', 'S', 'ſ', chr(0x13)],
-        0x13: ['d', 'D', 'ð', chr(0x04)],
-        0x14: ['f', 'F', 'đ', chr(0x06)],
-        0x15: ['g', 'G', 'ŋ', chr(0x07)],
-        0x16: ['h', 'H', 'ħ', chr(0x08)],
-        0x17: ['j', 'J', '.', chr(0x0A)],
-        0x18: ['k', 'K', 'ĸ', chr(0x0B)],
-        0x19: ['l', 'L', 'ł', chr(0x0C)],
-        0x1A: ['ö', 'Ö', '˝', ''],
-        0x1B: ['ä', 'Ä', '^', chr(0x1B)],
-        0x1C: ['#', 'Ä', '’', chr(0x1D)],
-        0x44: ['4', '4', chr(0x1B), chr(0x1B), 'D'],  # NUMPAD 4 and LEFT ARROW
-        0x45: ['5', '5', '', ''],
-        # NUMPAD 6 and RIGHT ARROW
-        0x46: ['6', '6', chr(0x1B), chr(0x1B), 'C'],
-        0x4D: [chr(0x0D), '', '', ''],  # ENTER
-        # ROW 4
-        # 0x57: ['', '', ''], #CTRL
-        0x0E: ['<', '>', '|', ''],
-        0x01: ['y', 'Y', '»', chr(0x1A)],
-        0x02: ['x', 'X', '«', chr(0x18)],
-        0x03: ['c', 'C', '¢', chr(0x03)],
-        0x04: ['v', 'V', '„', chr(0x16)],
-        0x05: ['b', 'B', '“”', chr(0x02)],
-        0x06: ['n', 'N', '”', chr(0x0E)],
-        0x07: ['m', 'M', 'µ', chr(0x0D)],
-        0x08: [',', ';', '·', ''],
-        0x09: ['.', ':', '…', ''],
-        0x0A: ['-', '_', '–', chr(0x1F)],
-        # 0x56: ['', '', ''], #ALT
-        0x0C: ['', '', '', ''],
-        0x41: ['1', '1', '', ''],
-        0x42: ['2', '2', chr(0x1B), chr(0x1B), 'B'],  # NUMPAD 2 and DOWN ARROW
-        0x43: ['3', '3', '', ''],
-        0x68: ['', '', '', ''],
-        0x40: ['0', '0', '', ''],
-        0x4A: [',', '', '', ''],
-        # ROW 5
-        0x0F: [' ', ' ', '', ''],  # SPACE BAR
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-        },
-    },
-
-    'ENHANCED_ES': {
-
-        # SPECIAL FUNCTION KEYS MAPPINGS
-        'CTRL_PRESS': [0x14],
-        'CTRL_RELEASE': [0x94],
-        'ALT_PRESS': [0x58],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x12, 0x59],
-        'SHIFT_RELEASE': [0x92, 0xD9],
-        'CAPS_LOCK': [0x11],
-        'EXTRA': [],
-
-        # ESC AND FUNCTION BLOCK KEYS MAPPINGS
-        # KEYS FROM LEFT TO RIGHT
-        0x08: [chr(0x1B), chr(0x1B), '', ''],  # ESC
-        # 0x07: ['', '', '', ''], #F1
-        # 0x0F: ['', '', '', ''], #F2
-        # 0x17: ['', '', '', ''], #F3
-        # 0x1F: ['', '', '', ''], #F4
-        # 0x27: ['', '', '', ''], #F5
-        # 0x2F: ['', '', '', ''], #F6
-        # 0x37: ['', '', '', ''], #F7
-        # 0x3F: ['', '', '', ''], #F8
-        # 0x47: ['', '', '', ''], #F9
-        # 0x4F: ['', '', '', ''], #F10
-        # 0x4F: ['', '', '', ''], #F11
-        # 0x5E: ['', '', '', ''], #F12
-
-        # MAIN ALPHA BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x0E: ['º', 'ª', '\\', ''],
-        0x16: ['1', '!', '|', ''],
-        0x1E: ['2', '"', '@', ''],
-        0x26: ['3', '·', '#', ''],
-        0x25: ['4', '$', '~', ''],
-        0x2E: ['5', '%', '½', ''],
-        0x36: ['6', '&', '', ''],
-        0x3D: ['7', '/', '', ''],
-        0x3E: ['8', '(', '', ''],
-        0x46: ['9', ')', '', ''],
-        0x45: ['0', '=', '', ''],
-        0x4E: ['\'', '?', '', chr(0x1C)],
-        0x55: ['¡', '¿', '', ''],
-        0x66: [chr(0x08), chr(0x08), '', ''],  # BS
-        # ROW 2
-        0x0D: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x15: ['q', 'Q', '', chr(0x11)],
-        0x1D: ['w', 'W', '', chr(0x17)],
-        0x24: ['e', 'E', '', chr(0x05)],
-        0x2D: ['r', 'R', '', chr(0x12)],
-        0x2C: ['t', 'T', '', chr(0x14)],
-        0x35: ['y', 'Y', '', chr(0x19)],
-        0x3C: ['u', 'U', '', chr(0x15)],
-        0x43: ['i', 'I', '', chr(0x09)],
-        0x44: ['o', 'O', '', chr(0x0F)],
-        0x4D: ['p', 'P', '', chr(0x10)],
-        0x5B: ['+', '*', ']', chr(0x1D)],
-        0x5A: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        # ROW 3
-        0x1C: ['a', 'A', '', chr(0x01)],
-        0x1B: ['s', 'S', '', chr(0x13)],
-        0x23: ['d', 'D', '', chr(0x04)],
-        0x2B: ['f', 'F', '', chr(0x06)],
-        0x34: ['g', 'G', '', chr(0x07)],
-        0x33: ['h', 'H', '', chr(0x08)],
-        0x3B: ['j', 'J', '', chr(0x0A)],
-        0x42: ['k', 'K', '', chr(0x0B)],
-        0x4B: ['l', 'L', '', chr(0x0C)],
-        0x4C: ['ñ', 'Ñ', '', ''],
-        0x52: ['´', '¨', '{', chr(0x1B)],
-        0x5C: ['ç', 'Ç', '}', chr(0x1D)],
-        # ROW 4
-        0x13: ['<', '>', '|', ''],
-        0x1A: ['z', 'Z', '', chr(0x1A)],
-        0x22: ['x', 'X', '', chr(0x18)],
-        0x21: ['c', 'C', '', chr(0x03)],
-        0x2A: ['v', 'V', '', chr(0x16)],
-        0x32: ['b', 'B', '', chr(0x02)],
-        0x31: ['n', 'N', '', chr(0x0E)],
-        0x3A: ['m', 'M', '', chr(0x0D)],
-        0x41: [',', ';', '', ''],
-        0x49: ['.', ':', '', ''],
-        0x4A: ['-', '_', '', chr(0x1F)],
-        # ROW 5
-        0x29: [' ', ' ', '', ''],  # SPACE BAR
-
-        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # TBD
-
-        # ARROW KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        0x63: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'A'],  # UP ARROW
-        0x61: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'D'],  # LEFT ARROW
-        0x60: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'B'],  # DOWN ARROW
-        0x6A: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'C'],  # RIGHT ARROW
-
-        # NUMPAD KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x4A: ['/', '/', '', ''],
-        0x3E: ['*', '*', '', ''],
-        0x7F: ['-', '-', '', ''],
-        # ROW 2
-        0x6C: ['7', '7', '', ''],
-        # NUMPAD 8  EXTRA UP ARROW
-        0x75: ['8', '8', chr(0x1B), chr(0x1B), 'A'],
-        0x7D: ['9', '9', '', ''],
-        0x7B: ['+', '+', '', ''],
-        # ROW 3
-        # NUMPAD 4   EXTRA LEFT ARROW
-        0x6b: ['4', '4', chr(0x1B), chr(0x1B), 'D'],
-        0x73: ['5', '5', '', ''],
-        # NUMPAD 6 EXTRA RIGHT ARROW
-        0x74: ['6', '6', chr(0x1B), chr(0x1B), 'C'],
-        0x58: [chr(0x0D), '', '', ''],  # ENTER,
-        # ROW 4
-        0x69: ['1', '1', '', ''],
-        # NUMPAD 2  EXTRA DOWN ARROW
-        0x72: ['2', '2', chr(0x1B), chr(0x1B), 'B'],
-        0x7A: ['3', '3', '', ''],
-        # ROW 5
-        0x70: ['0', '0', '', ''],
-        0x71: ['.', '', '', ''],
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-        },
-    },
-
-    'ENHANCED_DE': {
-
-        # ESC AND FUNCTION BLOCK KEYS MAPPINGS
-        # KEYS FROM LEFT TO RIGHT
-        'CTRL_PRESS': [0x14],
-        'CTRL_RELEASE': [0x94],
-        'ALT_PRESS': [0X58],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x12, 0x59],
-        'SHIFT_RELEASE': [0x92, 0xD9],
-        'CAPS_LOCK': [0x11],
-        'EXTRA': [],
-        0x08: [chr(0x1B), chr(0x1B), '', ''],  # ESC
-        # 0x07: ['', '', '', ''], #F1
-        # 0x0F: ['', '', '', ''], #F2
-        # 0x17: ['', '', '', ''], #F3
-        # 0x1F: ['', '', '', ''], #F4
-        # 0x27: ['', '', '', ''], #F5
-        # 0x2F: ['', '', '', ''], #F6
-        # 0x37: ['', '', '', ''], #F7
-        # 0x3F: ['', '', '', ''], #F8
-        # 0x47: ['', '', '', ''], #F9
-        # 0x4F: ['', '', '', ''], #F10
-        # 0x4F: ['', '', '', ''], #F11
-        # 0x5E: ['', '', '', ''], #F12
-        # TBD UP TO F24
-
-
-        # MAIN ALPHA BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x0E: ['^', '°', '′', ''],
-        0x16: ['1', '!', '¹', ''],
-        0x1E: ['2', '"', '²', ''],
-        0x26: ['3', '§', '³', ''],
-        0x25: ['4', '$', '¼', ''],
-        0x2E: ['5', '%', '½', ''],
-        0x36: ['6', '&', '¬', ''],
-        0x3D: ['7', '/', '{', ''],
-        0x3E: ['8', '(', '[', ''],
-        0x46: ['9', ')', ']', ''],
-        0x45: ['0', '=', '}', ''],
-        0x4E: ['ß', '?', '\\', chr(0x1C)],
-        0x55: ['´', '`', '¸', ''],
-        0x66: [chr(0x08), chr(0x08), '', ''],  # BS
-        # ROW 2
-        0x0D: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x15: ['q', 'Q', '@', chr(0x11)],
-        0x1D: ['w', 'W', 'ł', chr(0x17)],
-        0x24: ['e', 'E', '€', chr(0x05)],
-        0x2D: ['r', 'R', '¶', chr(0x12)],
-        0x2C: ['t', 'T', 'ŧ', chr(0x14)],
-        0x35: ['z', 'Z', '←', chr(0x19)],
-        0x3C: ['u', 'U', '↓', chr(0x15)],
-        0x43: ['i', 'I', '→', chr(0x09)],
-        0x44: ['o', 'O', 'ø', chr(0x0F)],
-        0x4D: ['p', 'P', 'þ', chr(0x10)],
-        0x5B: ['ü', 'Ü', '~', chr(0x1D)],
-        0x5A: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        # ROW 3
-        0x1C: ['a', 'A', 'æ', chr(0x01)],
-        0x1B: ['s', 'S', 'ſ', chr(0x13)],
-        0x23: ['d', 'D', 'ð', chr(0x04)],
-        0x2B: ['f', 'F', 'đ', chr(0x06)],
-        0x34: ['g', 'G', 'ŋ', chr(0x07)],
-        0x33: ['h', 'H', 'ħ', chr(0x08)],
-        0x3B: ['j', 'J', '.', chr(0x0A)],
-        0x42: ['k', 'K', 'ĸ', chr(0x0B)],
-        0x4B: ['l', 'L', 'ł', chr(0x0C)],
-        0x4C: ['ö', 'Ö', '˝', ''],
-        0x52: ['ä', 'Ä', '^', chr(0x1B)],
-        0x5C: ['#', '\'', '’', chr(0x1D)],
-        # ROW 4
-        0x13: ['<', '>', '|', ''],
-        0x1A: ['y', 'Y', '»', chr(0x1A)],
-        0x22: ['x', 'X', '«', chr(0x18)],
-        0x21: ['c', 'C', '¢', chr(0x03)],
-        0x2A: ['v', 'V', '„', chr(0x16)],
-        0x32: ['b', 'B', '“”', chr(0x02)],
-        0x31: ['n', 'N', '”', chr(0x0E)],
-        0x3A: ['m', 'M', 'µ', chr(0x0D)],
-        0x41: [',', ';', '·', ''],
-        0x49: ['.', ':', '…', ''],
-        0x4A: ['-', '_', '–', chr(0x1F)],
-        # ROW 5
-        0x29: [' ', ' ', '', ''],  # SPACE BAR
-        0x2B: ['`', '^', '¨', chr(0x1B)],
-
-        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # TBD
-
-        # ARROW KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        0x63: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'A'],  # UP ARROW
-        0x61: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'D'],  # LEFT ARROW
-        0x60: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'B'],  # DOWN ARROW
-        0x6A: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'C'],  # RIGHT ARROW
-
-        # NUMPAD KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x4A: ['/', '/', '', ''],
-        0x3E: ['*', '*', '', ''],
-        0x7F: ['-', '-', '', ''],
-        # ROW 2
-        0x6C: ['7', '7', '', ''],
-        # NUMPAD 8  EXTRA UP ARROW
-        0x75: ['8', '8', chr(0x1B), chr(0x1B), 'A'],
-        0x7D: ['9', '9', '', ''],
-        0x7B: ['+', '+', '', ''],
-        # ROW 3
-        # NUMPAD 4   EXTRA LEFT ARROW
-        0x6b: ['4', '4', chr(0x1B), chr(0x1B), 'D'],
-        0x73: ['5', '5', '', ''],
-        # NUMPAD 6 EXTRA RIGHT ARROW
-        0x74: ['6', '6', chr(0x1B), chr(0x1B), 'C'],
-        0x58: [chr(0x0D), '', '', ''],  # ENTER,
-        # ROW 4
-        0x69: ['1', '1', '', ''],
-        # NUMPAD 2  EXTRA DOWN ARROW
-        0x72: ['2', '2', chr(0x1B), chr(0x1B), 'B'],
-        0x7A: ['3', '3', '', ''],
-        # ROW 5
-        0x70: ['0', '0', '', ''],
-        0x71: ['.', '', '', ''],
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-        },
-    },
-
-    '122KEY_DE': {
-
-        # SPECIAL FUNCTION KEYS MAPPINGS
-        'CTRL_PRESS': [0x54],
-        'CTRL_RELEASE': [0xD4],
-        'ALT_PRESS': [0x68],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x57, 0x56],
-        'SHIFT_RELEASE': [0xD7, 0xD6],
-        'CAPS_LOCK': [0x7E],  # Grdst
-        'EXTRA': [0x6F],
-
-        # LEFT FUNCTION KEYS MAPPINGS (F1-F10)
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x7C: [chr(0x1B), chr(0x1B), '', ''],  # ESC
-        # TBD UP TO F10
-
-        # TOP FUNCTION KEYS MAPPINGS (F1-F24)
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        # 0x31: ['', '', '', ''], #F1
-        # 0x32: ['', '', '', ''], #F2
-        # 0x33: ['', '', '', ''], #F3
-        # 0x34: ['', '', '', ''], #F4
-        # 0x35: ['', '', '', ''], #F5
-        # 0x36: ['', '', '', ''], #F6
-        # 0x37: ['', '', '', ''], #F7
-        # 0x38: ['', '', '', ''], #F8
-        # 0x38: ['', '', '', ''], #F9
-        # 0x3A: ['', '', '', ''], #F10
-        # 0x3B: ['', '', '', ''], #F11
-        # 0x3C: ['', '', '', ''], #F12
-        # TBD UP TO F24
-
-        # MAIN ALPHA BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x3E: ['^', '°', '′', ''],
-        0x31: ['1', '!', '¹', ''],
-        0x32: ['2', '"', '²', ''],
-        0x33: ['3', '§', '³', ''],
-        0x34: ['4', '$', '¼', ''],
-        0x35: ['5', '%', '½', ''],
-        0x36: ['6', '&', '¬', ''],
-        0x37: ['7', '/', '{', ''],
-        0x38: ['8', '(', '[', ''],
-        0x39: ['9', ')', ']', ''],
-        0x3A: ['0', '=', '}', ''],
-        0x3B: ['ß', '?', '\\', chr(0x1C)],
-        0x3C: ['´', '`', '¸', ''],
-        0x3D: [chr(0x08), chr(0x08), '', ''],  # BS
-        # ROW 2
-        0x20: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x21: ['q', 'Q', '@', chr(0x11)],
-        0x22: ['w', 'W', 'ł', chr(0x17)],
-        0x23: ['e', 'E', '€', chr(0x05)],
-        0x24: ['r', 'R', '¶', chr(0x12)],
-        0x25: ['t', 'T', 'ŧ', chr(0x14)],
-        0x26: ['z', 'Z', '←', chr(0x19)],
-        0x27: ['u', 'U', '↓', chr(0x15)],
-        0x28: ['i', 'I', '→', chr(0x09)],
-        0x29: ['o', 'O', 'ø', chr(0x0F)],
-        0x2A: ['p', 'P', 'þ', chr(0x10)],
-        0x2B: ['ü', 'Ü', '~', chr(0x1D)],
-        0x2C: ['+', '*', '~', chr(0x1D)],
-        0x2D: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        # ROW 3
-        0x11: ['a', 'A', 'æ', chr(0x01)],
-        0x12: ['s', 'S', 'ſ', chr(0x13)],
-        0x13: ['d', 'D', 'ð', chr(0x04)],
-        0x14: ['f', 'F', 'đ', chr(0x06)],
-        0x15: ['g', 'G', 'ŋ', chr(0x07)],
-        0x16: ['h', 'H', 'ħ', chr(0x08)],
-        0x17: ['j', 'J', '.', chr(0x0A)],
-        0x18: ['k', 'K', 'ĸ', chr(0x0B)],
-        0x19: ['l', 'L', 'ł', chr(0x0C)],
-        0x1A: ['ö', 'Ö', '˝', ''],
-        0x1B: ['ä', 'Ä', '^', chr(0x1B)],
-        0x1C: ['#', '\'', '’', chr(0x1D)],
-        # ROW 4
-        0x0e: ['<', '>', '|', ''],
-        0x01: ['y', 'Y', '»', chr(0x1A)],
-        0x02: ['x', 'X', '«', chr(0x18)],
-        0x03: ['c', 'C', '¢', chr(0x03)],
-        0x04: ['v', 'V', '„', chr(0x16)],
-        0x05: ['b', 'B', '“”', chr(0x02)],
-        0x06: ['n', 'N', '”', chr(0x0E)],
-        0x07: ['m', 'M', 'µ', chr(0x0D)],
-        0x08: [',', ';', '·', ''],
-        0x09: ['.', ':', '…', ''],
-        0x0a: ['-', '_', '–', chr(0x1F)],
-        # ROW 5
-        0x0F: [' ', ' ', '', ''],  # SPACE BAR
-
-
-        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # TBD
-
-        # ARROW KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        0x71: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'A'],  # UP ARROW
-        0x72: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'D'],  # LEFT ARROW
-        # TBD CENTER ARROW
-        0x73: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'C'],  # RIGHT ARROW
-        0x70: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'B'],  # DOWN ARROW
-
-        # NUMPAD KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x4A: ['/', '/', '', ''],
-        0x3E: ['*', '*', '', ''],
-        0x7F: ['-', '-', '', ''],
-        # ROW 2
-        0x47: ['7', '7', '', ''],
-        # NUMPAD 8  EXTRA UP ARROW
-        0x48: ['8', '8', chr(0x1B), chr(0x1B), 'A'],
-        0x49: ['9', '9', '', ''],
-        0x7B: ['+', '+', '', ''],
-        # ROW 3
-        # NUMPAD 4   EXTRA LEFT ARROW
-        0x44: ['4', '4', chr(0x1B), chr(0x1B), 'D'],
-        0x45: ['5', '5', '', ''],
-        0x46: ['6', '6', '', '', 'C'],  # NUMPAD 6 EXTRA RIGHT ARROW
-        # ROW 4
-        0x41: ['1', '1', '', ''],
-        # NUMPAD 2  EXTRA DOWN ARROW
-        0x42: ['2', chr(0x1B), chr(0x1B), '', 'B'],
-        0x43: ['3', '3', '', ''],
-        0x2D: [chr(0x0D), '', '', ''],  # ENTER
-        # ROW 5
-        0x40: ['0', '0', '', ''],
-        0x4A: ['.', '', '', ''],
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-        },
-    },
-
-    '122KEY_EN': {
-
-        # SPECIAL FUNCTION KEYS MAPPINGS
-        'CTRL_PRESS': [0x54],
-        'CTRL_RELEASE': [0xD4],
-        'ALT_PRESS': [0x68],
-        'ALT_RELEASE': [],
-        'SHIFT_PRESS': [0x57, 0x56],
-        'SHIFT_RELEASE': [0xD7, 0xD6],
-        'CAPS_LOCK': [0x7E],  # Reset
-        'EXTRA': [0x6F],
-
-        # LEFT FUNCTION KEYS MAPPINGS (F1-F10)
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x7C: [chr(0x1B), chr(0x1B), '', ''],  # ESC
-        # TBD UP TO F10
-
-        # MAIN ALPHA BLOCK KEYS MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1
-        0x3E: ['`', '~', '′', ''],
-        # F1 through F12 generate the following scan codes with an
-        # 0x6F prefix, so position 5 (EXTRA) is used for those keys.
-        # The escape sequences in position 5 correspond to the "xterm"
-        # terminfo entry's key_f1 through key_f12.  F13 through F24
-        # generate the same scan codes but with a shift key down/make
-        # scan code prefix; there is no way to specify handling of the
-        # combination of Shift + EXTRA.
-        0x31: ['1', '!', '¹', '',         None, 'OP'],
-        0x32: ['2', '@', '²', '',         None, 'OQ'],
-        0x33: ['3', '#', '³', '',         None, 'OR'],
-        0x34: ['4', '$', '¼', '',         None, 'OS'],
-        0x35: ['5', '%', '½', '',         None, '[15~'],
-        0x36: ['6', '^', '¬', chr(0x1E),  None, '[17~'],
-        0x37: ['7', '&', '{', '',         None, '[18~'],
-        0x38: ['8', '*', '[', '',         None, '[19~'],
-        0x39: ['9', '(', ']', '',         None, '[20~'],
-        0x3A: ['0', ')', '}', '',         None, '[21~'],
-        0x3B: ['-', '_', '\\', chr(0x1F), None, '[23~'],
-        0x3C: ['=', '+', '¸', '',         None, '[24~'],
-        0x3D: [chr(0x08), chr(0x08), '', ''],  # BS
-        # ROW 2
-        0x20: [chr(0x09), chr(0x09), '', ''],  # TAB
-        0x21: ['q', 'Q', '@', chr(0x11), None, 'q'],
-        0x22: ['w', 'W', 'ł', chr(0x17), None, 'w'],
-        0x23: ['e', 'E', '€', chr(0x05), None, 'e'],
-        0x24: ['r', 'R', '¶', chr(0x12), None, 'r'],
-        0x25: ['t', 'T', 'ŧ', chr(0x14), None, 't'],
-        0x26: ['y', 'Y', '←', chr(0x19), None, 'y'],
-        0x27: ['u', 'U', '↓', chr(0x15), None, 'u'],
-        0x28: ['i', 'I', '→', chr(0x09), None, 'i'],
-        0x29: ['o', 'O', 'ø', chr(0x0F), None, 'o'],
-        0x2A: ['p', 'P', 'þ', chr(0x10), None, 'p'],
-        0x2B: ['[', ']', '~', chr(0x1D)],
-        0x2C: ['\\', '|', '~', chr(0x1C)],
-        0x2D: [chr(0x0D), chr(0x0D), '', ''],  # ENTER
-        # ROW 3
-        0x11: ['a', 'A', 'æ', chr(0x01), None, 'a'],
-        0x12: ['s', 'S', 'ſ', chr(0x13), None, 's'],
-        0x13: ['d', 'D', 'ð', chr(0x04), None, 'd'],
-        0x14: ['f', 'F', 'đ', chr(0x06), None, 'f'],
-        0x15: ['g', 'G', 'ŋ', chr(0x07), None, 'g'],
-        0x16: ['h', 'H', 'ħ', chr(0x08), None, 'h'],
-        0x17: ['j', 'J', '.', chr(0x0A), None, 'j'],
-        0x18: ['k', 'K', 'ĸ', chr(0x0B), None, 'k'],
-        0x19: ['l', 'L', 'ł', chr(0x0C), None, 'l'],
-        0x1A: [';', ':', '˝', ''],
-        0x1B: ['\'', '"', '^', chr(0x1B)],
-        0x1C: ['{', '}', '’', chr(0x1D)],
-        # ROW 4
-        0x0e: ['<', '>', '|', ''],
-        0x01: ['z', 'Z', '»',  chr(0x1A), None, 'z'],
-        0x02: ['x', 'X', '«',  chr(0x18), None, 'x'],
-        0x03: ['c', 'C', '¢',  chr(0x03), None, 'c'],
-        0x04: ['v', 'V', '„',  chr(0x16), None, 'v'],
-        0x05: ['b', 'B', '“”', chr(0x02), None, 'b'],
-        0x06: ['n', 'N', '”',  chr(0x0E), None, 'n'],
-        0x07: ['m', 'M', 'µ',  chr(0x0D), None, 'm'],
-        0x08: [',', '<', '·', '',         None, ','],
-        0x09: ['.', '>', '…', '',         None, '.'],
-        0x0a: ['/', '?', '–', chr(0x1F)],
-        # ROW 5
-        0x0F: [' ', ' ', '', chr(0x00)],  # SPACE BAR
-
-
-        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        0x4b: [chr(0x1B), chr(0x1B), chr(0x1B), '', ''], #insert?
-        # 0x4c: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'F'], # end works, DUP on kb
-        # 0x62: [chr(0x1B), chr(0x1B), chr(0x1B), '', ''], # blank
-        0xc: [chr(0x1b), chr(0x1b), chr(0x1b), '', chr(0x7F)], # delete line
-        # 0x6c: [chr(0x1b), chr(0x1b), chr(0x1b), '', ''], #
-        # 0x57: [chr(0x1B), chr(0x1B), chr(0x1B), '', ''], #
-        # 0x6c
-
-        # ARROW KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        0x71: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'A'],  # UP ARROW
-        0x72: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'D'],  # LEFT ARROW
-        # TBD CENTER ARROW
-        0x73: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'C'],  # RIGHT ARROW
-        0x70: [chr(0x1B), chr(0x1B), chr(0x1B), '', 'B'],  # DOWN ARROW
-
-        # NUMPAD KEYS BLOCK MAPPINGS
-        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
-        # ROW 1 (ALL BLANK)
-        # 0x1D is in the position of Num Lock on a 101 key keyboard,
-        # so do nothing with it
-        0x1E: ['/', '/', '', ''],
-        0x4F: ['*', '*', '', ''],
-        0x50: ['-', '-', '', ''],
-        # ROW 2
-        0x47: ['7', '7', '', ''],
-        # NUMPAD 8  EXTRA UP ARROW
-        0x48: ['8', '8', chr(0x1B), chr(0x1B), 'A'],
-        0x49: ['9', '9', '', ''],
-        0x7B: ['+', '+', '', ''],
-        # ROW 3
-        # NUMPAD 4   EXTRA LEFT ARROW
-        0x44: ['4', '4', chr(0x1B), chr(0x1B), 'D'],
-        0x45: ['5', '5', '', ''],
-        0x46: ['6', '6', '', '', 'C'],  # NUMPAD 6 EXTRA RIGHT ARROW
-        # ROW 4
-        0x41: ['1', '1', '', ''],
-        # NUMPAD 2  EXTRA DOWN ARROW
-        0x42: ['2', chr(0x1B), chr(0x1B), '', 'B'],
-        0x43: ['3', '3', '', ''],
-        0x2D: [chr(0x0D), '', '', ''],  # ENTER
-        # ROW 5
-        0x40: ['0', '0', '', ''],
-        0x4A: ['.', '', '', ''],
-
-        # Custom character conversions, from ASCII char to EBCDIC code that
-        # will override the DEFAULT_CODEPAGE conversions
-        'CUSTOM_CHARACTER_CONVERSIONS': {
-        },
-    },
-
-    # ENTER HERE YOUR ADDITIONAL SCANCODE MAPPINGS
-
-}
-
-# Add a scancode mapping variant which requires use of the custom
-# terminfo file.
-#
-# Use dict() to make a copy.
-scancodeDictionaries["122KEY_EN_CUSTOM"] = dict(scancodeDictionaries["122KEY_EN"])
-# Send the delete character for the Backspace key as is done by most
-# modern terminals (e.g. xterm) rather than sending ^H.  This is
-# useful in GNU Emacs so that Ctrl-H can be used to request help.  See
-# also https://github.com/inmbolmie/5250_usb_converter/issues/19  As
-# noted in that issue, generally it doesn't seem to be necessary for
-# this to match what is set in the terminfo description - what is set
-# via 'stty' seems to be what matters - so it would probably be
-# reasonably safe to apply this setting directly to 122KEY_EN instead
-# of adding this new scancode map.
-scancodeDictionaries["122KEY_EN_CUSTOM"][0x3D] = [chr(0x7F), chr(0x7F), '', '']
-
-
-# Max commands pending to send to 5251 in command queue (flow control)
-COMMAND_QUEUE_MAX_PENDING = 50
+# Path of the Unix Domain Socket for CMD connections
+UDS_SOCKET_PATH = "/tmp/5250_cmd_sock"
+
+# Buffer size for the debug and I/O log files
+LOG_BUFFER_SIZE = 1 << 20
+
+# Seconds between background flushes of the log files. Flushing by time
+# from the flusher thread keeps a message counter out of the I/O paths
+LOG_FLUSH_INTERVAL = 5
+
+# Special key groups of the layouts
+SPECIAL_KEYS = ('CTRL_PRESS', 'CTRL_RELEASE', 'ALT_PRESS', 'ALT_RELEASE',
+                'SHIFT_PRESS', 'SHIFT_RELEASE', 'CAPS_LOCK', 'EXTRA')
+
+SCANCODE_TABLE_SIZE = 256
+
+# Rows of the key sequence tables, one for each modifier state
+KEY_NORMAL = 0
+KEY_SHIFT = 1
+KEY_ALT = 2
+KEY_CTRL = 3
+KEY_EXTRA = 4
+
+# Modifier row for every combination of the modifier flags, indexed by
+# shift xor caps lock (bit 0), ctrl (bit 1), alt (bit 2) and extra (bit 3).
+# Shift wins over ctrl, ctrl over alt and alt over extra
+MODIFIER_ROWS = tuple(
+    KEY_SHIFT if state & 1 else
+    KEY_CTRL if state & 2 else
+    KEY_ALT if state & 4 else
+    KEY_EXTRA if state & 8 else
+    KEY_NORMAL
+    for state in range(16))
+
+# Size of the block of each layout in KEY_SEQUENCES
+KEY_SEQUENCE_BLOCK_SIZE = (KEY_EXTRA + 1) * SCANCODE_TABLE_SIZE
+
+# Special key groups of a layout, in the same order as SPECIAL_KEYS
+SpecialKeys = collections.namedtuple('SpecialKeys', (
+    'ctrlPress', 'ctrlRelease', 'altPress', 'altRelease',
+    'shiftPress', 'shiftRelease', 'capsLock', 'extra'))
+
+# Tables derived from a layout dictionary
+LayoutTables = collections.namedtuple('LayoutTables', (
+    'scancodeTable', 'specialKeys', 'keySequenceOffset', 'modifierKeys',
+    'keysByCharacter'))
+
+# VT52_to_5250 handler of each special key group, in the order they are
+# checked, so a scancode listed in several groups keeps the first one
+MODIFIER_HANDLERS = (
+    ('extra', 'pressExtra'),
+    ('shiftPress', 'pressShift'),
+    ('shiftRelease', 'releaseShift'),
+    ('ctrlPress', 'pressControl'),
+    ('ctrlRelease', 'releaseControl'),
+    ('altPress', 'pressAlt'),
+    ('altRelease', 'releaseAlt'),
+    ('capsLock', 'toggleCapsLock'))
+
+# Key sequences of all the layouts in use packed in one flat table, indexed
+# by the keySequenceOffset of the layout + ((modifier << 8) | scancode)
+KEY_SEQUENCES = []
+
+# Tables of the layouts in use, built the first time a terminal asks for
+# them so layouts nobody uses cost nothing
+layoutTables = {}
+
+# Rows and key sequences shared between layouts, as most keys map the same
+# way on all of them
+sharedMappings = {}
+sharedSequences = {}
+
+
+# Dense table indexed by scancode. Each slot holds the key mapping or None
+# if the layout doesn't map that scancode. Mappings are padded to 6
+# positions so they all have the same shape, with '' for a missing position
+# 4 and None for a missing position 5. Strings are interned and identical
+# rows shared with other layouts
+def buildScancodeTable(dictionary):
+    table = [None] * SCANCODE_TABLE_SIZE
+    for scancode, mapping in dictionary.items():
+        if isinstance(scancode, int):
+            mapping = list(mapping[:4]) + [
+                mapping[4] if len(mapping) > 4 and mapping[4] is not None
+                else '',
+                mapping[5] if len(mapping) > 5 else None]
+            mapping = tuple(sys.intern(position) if position is not None
+                            else None for position in mapping)
+            table[scancode] = sharedMappings.setdefault(mapping, mapping)
+    return tuple(table)
+
+
+# Encode a key sequence as it is written to the shell PTY
+def encodeKeySequence(sequence):
+    sequence = sequence.encode()
+    return sharedSequences.setdefault(sequence, sequence)
+
+
+# Flattens a scancode table into the final byte sequences to send to the
+# shell, indexed by (modifier << 8) | scancode. Keys that resolve to ESC get
+# their extra char appended and EXTRA keys get the ESC prefix, so a
+# keystroke becomes a single lookup
+def buildKeySequenceTable(table):
+    sequences = [None] * KEY_SEQUENCE_BLOCK_SIZE
+    for scancode, mapping in enumerate(table):
+        if mapping is None:
+            continue
+        for modifier, position in ((KEY_NORMAL, 0), (KEY_SHIFT, 1),
+                                   (KEY_ALT, 2), (KEY_CTRL, 3)):
+            sequence = mapping[position]
+            if sequence == ESC:
+                sequence = sequence + mapping[4]
+            sequences[(modifier << 8) | scancode] = \
+                encodeKeySequence(sequence)
+        if mapping[5] is not None:
+            sequences[(KEY_EXTRA << 8) | scancode] = \
+                encodeKeySequence(ESC + mapping[5])
+    return sequences
+
+
+# Map every special key scancode of a layout to the name of its handler, so
+# a keystroke needs a single lookup to know if it is a modifier
+def buildModifierKeys(specialKeys):
+    modifierKeys = {}
+    for group, handler in MODIFIER_HANDLERS:
+        for scancode in getattr(specialKeys, group):
+            modifierKeys.setdefault(scancode, handler)
+    return modifierKeys
+
+
+# Map the unshifted character of every key to the scancodes that produce it,
+# in layout order, for the CLI commands that type keys by character
+def buildKeysByCharacter(dictionary):
+    keysByCharacter = {}
+    for scancode, mapping in dictionary.items():
+        if isinstance(scancode, int):
+            keysByCharacter.setdefault(mapping[0], []).append(scancode)
+    return {character: tuple(scancodes)
+            for character, scancodes in keysByCharacter.items()}
+
+
+# Get the tables of a layout, building them on first use
+def getLayoutTables(layout):
+    tables = layoutTables.get(layout)
+    if tables is None:
+        dictionary = scancodeDictionaries[layout]
+        scancodeTable = buildScancodeTable(dictionary)
+        # Scancodes fit in a byte, so the special key groups are kept as
+        # bytes instead of lists of ints. Indexing them still gives ints
+        specialKeys = SpecialKeys(*(bytes(dictionary[key])
+                                    for key in SPECIAL_KEYS))
+        keySequenceOffset = len(KEY_SEQUENCES)
+        KEY_SEQUENCES.extend(buildKeySequenceTable(scancodeTable))
+        tables = LayoutTables(scancodeTable, specialKeys, keySequenceOffset,
+                              buildModifierKeys(specialKeys),
+                              buildKeysByCharacter(dictionary))
+        layoutTables[layout] = tables
+    return tables
+
+
+# Max command sequences pending to send to 5251 in command queue (flow
+# control). A sequence holds around three commands on average
+COMMAND_QUEUE_MAX_PENDING = 18
+
+# Resends of a frame that got no EOTX before giving up on it. Each wait
+# already takes up to a second, the pause between resends doubles from
+# SERIAL_RETRY_DELAY up to SERIAL_RETRY_MAX_DELAY seconds.
+# Giving up on a command drops all the output queued for the terminal and
+# clears its screen, the text is missing until the application redraws
+SERIAL_MAX_RETRIES = 5
+SERIAL_RETRY_DELAY = 0.001
+SERIAL_RETRY_MAX_DELAY = 0.05
+
+# Max bytes taken from the shell PTY per read. A read returns whatever the
+# shell has written so far up to this size, so bulk output needs fewer
+# reads and escape scans. Kept moderate because everything read is queued
+# for the terminal at once, past the flow control limit above
+PTY_READ_SIZE = 1024
+
+# Max bytes taken from the local stdin per read
+STDIN_READ_SIZE = 8192
 
 # 5250 commands
 # Not all available commands are used here
-CLEAR = int('10010', 2)
-EOQ = int('1100010', 2)
-INSERT_CHARACTER = int('00011', 2)
-LOAD_ADDRESS_COUNTER = int('10101', 2)
-LOAD_CURSOR_REGISTER = int('10111', 2)
-LOAD_REFERENCE_COUNTER = int('00111', 2)
-MOVE_DATA = int('00110', 2)
-POLL = int('10000', 2)
-ACK = int('110000', 2)
-READ_ACTIVATE = int('0', 2)
-WRITE_ACTIVATE = int('1', 2)
-READ_DATA = int('01000', 2)
-READ_FIELD_IMMEDIATE = int('11001', 2)
-READ_REGISTERS = int('11100', 2)
-READ_TO_END_OF_LINE = int('01010', 2)
-RESET = int('00010', 2)
-SET_MODE = int('10011', 2)
-WRITE_CONTROL_DATA = int('00101', 2)
-WRITE_CONTROL_DATA_INDICATORS = int('1000101', 2)
-WRITE_DATA_LOAD_CURSOR = int('10001', 2)
-WRITE_DATA_LOAD_CURSOR_INDICATORS = int('1010001', 2)
-WRITE_IMMEDIATE_DATA = int('11101', 2)
-RESET_MSR = int('10010010', 2)
-RESET_LIGHT_PEN = int('10100010', 2)
+CLEAR: Final = 0b10010
+EOQ: Final = 0b1100010
+INSERT_CHARACTER: Final = 0b00011
+LOAD_ADDRESS_COUNTER: Final = 0b10101
+LOAD_CURSOR_REGISTER: Final = 0b10111
+LOAD_REFERENCE_COUNTER: Final = 0b00111
+MOVE_DATA: Final = 0b00110
+POLL: Final = 0b10000
+ACK: Final = 0b110000
+READ_ACTIVATE: Final = 0b0
+WRITE_ACTIVATE: Final = 0b1
+READ_DATA: Final = 0b01000
+READ_FIELD_IMMEDIATE: Final = 0b11001
+READ_REGISTERS: Final = 0b11100
+READ_TO_END_OF_LINE: Final = 0b01010
+RESET: Final = 0b00010
+SET_MODE: Final = 0b10011
+WRITE_CONTROL_DATA: Final = 0b00101
+WRITE_CONTROL_DATA_INDICATORS: Final = 0b1000101
+WRITE_DATA_LOAD_CURSOR: Final = 0b10001
+WRITE_DATA_LOAD_CURSOR_INDICATORS: Final = 0b1010001
+WRITE_IMMEDIATE_DATA: Final = 0b11101
+RESET_MSR: Final = 0b10010010
+RESET_LIGHT_PEN: Final = 0b10100010
+
+# Commands that leave the address counter and cursor register untouched
+COUNTER_PRESERVING_COMMANDS = frozenset((
+    EOQ, LOAD_REFERENCE_COUNTER, WRITE_CONTROL_DATA,
+    WRITE_CONTROL_DATA_INDICATORS))
 
 
 # Start of pseudo-terminal management code
@@ -1064,26 +321,30 @@ START_ALTERNATE_MODE = \
     set('\x1b[?{0}h'.format(i) for i in ('1049', '47', '1047'))
 END_ALTERNATE_MODE = \
     set('\x1b[?{0}l'.format(i) for i in ('1049', '47', '1047'))
-ALTERNATE_MODE_FLAGS = tuple(START_ALTERNATE_MODE) + tuple(END_ALTERNATE_MODE)
 
 
-def findlast(s, substrs):
+# All the flags in a single pattern, so the output is scanned only once. The
+# group that matched tells whether it was a start or an end flag
+ALTERNATE_MODE_PATTERN = re.compile(
+    '(?P<start>{0})|(?P<end>{1})'.format(
+        '|'.join(re.escape(flag) for flag in START_ALTERNATE_MODE),
+        '|'.join(re.escape(flag) for flag in END_ALTERNATE_MODE)))
+
+# Common prefix of all the flags, most output doesn't contain it at all
+ALTERNATE_MODE_PREFIX = '\x1b[?'
+
+
+def findlast(s, pattern):
     '''
-    Finds whichever of the given substrings occurs last in the given string
-    and returns that substring, or returns None if no such strings occur.
+    Finds the last match of the given pattern in the given string and returns
+    the name of the group that matched, or returns None if there is no match.
     '''
-    i = -1
-    result = None
-    for substr in substrs:
-        pos = 0
-        try:
-            pos = s.decode().rfind(substr)
-        except UnicodeDecodeError:
-            continue
-        if pos > i:
-            i = pos
-            result = substr
-    return result
+    match = None
+    for match in pattern.finditer(s):
+        pass
+    if match is None:
+        return None
+    return match.lastgroup
 
 
 # This class does the actual work of the pseudo terminal. The spawn() function
@@ -1165,6 +426,12 @@ class Interceptor(object):
         Called once when the pty is first set up.
         '''
         self._set_pty_size()
+        # Register the descriptors once instead of rebuilding a select set
+        # on every pass of the copy loop
+        self.poller = select.poll()
+        self.poller.register(self.master_fd, select.POLLIN)
+        if not disableInputCapture:
+            self.poller.register(pty.STDIN_FILENO, select.POLLIN)
 
     def _signal_winch(self, signum, frame):
         '''
@@ -1193,20 +460,25 @@ class Interceptor(object):
         assert self.master_fd is not None
         master_fd = self.master_fd
         time.sleep(1)
+        moreData = False
         while 1:
-            try:
-                rfds, wfds, xfds = select.select(
-                    [master_fd, pty.STDIN_FILENO], [], [])
-            except select.error as e:
-                if e[0] == 4:   # Interrupted system call.
+            if moreData:
+                # The last read filled the buffer so more output is most
+                # likely waiting, read it without polling first
+                rfds = (master_fd,)
+                moreData = False
+            else:
+                try:
+                    rfds = [fd for fd, event in self.poller.poll()]
+                except InterruptedError:
                     continue
             # Read data from shell if it is available and there aren't many
             # pending commands in queue (flow control)
-            q_size = outputCommandQueue[self.term.getStationAddress()].qsize()
+            q_size = len(outputCommandQueue[self.term.getStationAddress()])
             if master_fd in rfds and (q_size < COMMAND_QUEUE_MAX_PENDING) and \
                     self.term.getInitialized():
                 try:
-                    data = os.read(self.master_fd, 128)
+                    data = os.read(self.master_fd, PTY_READ_SIZE)
                 except (IOError, OSError, TypeError):
                     term[self.termAddress].reset()
                     debugLog.write("TERMINAL RESET DUE TO COPY ERROR: " +
@@ -1214,45 +486,53 @@ class Interceptor(object):
                     self.restart()
                     return
                 if data is not None:
+                    # Only when stdin isn't polled, a blocking read of the
+                    # shell must not hold back local input
+                    moreData = len(data) == PTY_READ_SIZE and \
+                        disableInputCapture
                     self.master_read(data)
                 '''
                 Called when there is data to be sent from the child process
                 back to the user.
                 '''
             if not disableInputCapture and pty.STDIN_FILENO in rfds:
-                data = os.read(pty.STDIN_FILENO, 1024)
-                self.stdin_read(data.decode())
+                data = os.read(pty.STDIN_FILENO, STDIN_READ_SIZE)
+                self.stdin_read(data)
 
     def master_read(self, data):
         '''
         Called when there is data to be sent from the child process back to
         the user.
         '''
-        flag = findlast(data, ALTERNATE_MODE_FLAGS)
+        text = data.decode('utf-8', 'ignore')
+        flag = None
+        if ALTERNATE_MODE_PREFIX in text:
+            flag = findlast(text, ALTERNATE_MODE_PATTERN)
         if flag is not None:
-            if flag in START_ALTERNATE_MODE:
+            if flag == 'start':
                 # This code is executed when the child process switches the
                 # terminal into alternate mode. The line below assumes that
                 # the user has opened vim, and writes a message.
                 self.write_master('IEntering special mode.\x1b')
-            elif flag in END_ALTERNATE_MODE:
+            else:
                 # This code is executed when the child process switches the
                 # terminal back out of alternate mode. The line below assumes
                 # that the user has returned to the command prompt.
                 self.write_master('echo "Leaving special mode."\r')
-        self.write_stdout(data.decode('utf-8', 'ignore'))
+        self.write_stdout(data, text)
 
-    def write_stdout(self, data):
+    def write_stdout(self, raw, text):
         '''
         Writes to stdout as if the child process had written the data.
+        raw is the data as read from the child, text its decoded form.
         '''
-        # os.write(pty.STDOUT_FILENO, data.encode())
+        # os.write(pty.STDOUT_FILENO, raw)
         global readLog
         global debugIO
         if debugIO:
-            readLog.write(data.encode())
+            readLog.write(raw)
 
-        self.term.txStringWithEscapeChars(data)
+        self.term.txStringWithEscapeChars(text)
         return
 
     def stdin_read(self, data):
@@ -1275,11 +555,15 @@ class Interceptor(object):
             return
         global writeLog
         global debugIO
+        # Keystrokes come already encoded, CLI input comes as text
+        if isinstance(data, str):
+            data = data.encode()
         if debugIO:
-            writeLog.write(data.encode())
-        while data != '':
-            n = os.write(master_fd, data.encode())
-            data = data[n:]
+            writeLog.write(data)
+        # Advance a view on partial writes instead of copying the tail
+        view = memoryview(data)
+        while view:
+            view = view[os.write(master_fd, view):]
 
     def arranque(self, _passarg):
         self.spawn()
@@ -1319,7 +603,7 @@ class Interceptor(object):
 
 time.sleep(1)
 
-BPS_SYMS = {
+BPS_SYMS = types.MappingProxyType({
     4800: termios.B4800,
     9600: termios.B9600,
     19200: termios.B19200,
@@ -1327,7 +611,7 @@ BPS_SYMS = {
     57600: termios.B57600,
     115200: termios.B115200,
     230400: termios.B230400
-}
+})
 
 # Indices into the termios tuple.
 
@@ -1340,10 +624,6 @@ OSPEED = 5
 CC = 6
 
 
-def bps_to_termios_sym(bps):
-    return BPS_SYMS[bps]
-
-
 # Routine to initialize USB-serial port
 def openSerial(port, speed):
     print("Connecting to 5250 converter USB Device at " + port)
@@ -1353,11 +633,13 @@ def openSerial(port, speed):
     except FileNotFoundError:
         print("The 5250 converter USB Device was not found at " + port +
               ". Run the application with -t DEVICE to use a different one")
-        os.kill(os.getpid(), signal.SIGKILL)
-        sys.exit()
+        # Running in the serial thread, so sys.exit() would only end the
+        # thread; leave the whole process at once
+        sys.stdout.flush()
+        os._exit(1)
 
     attrs = termios.tcgetattr(fd)
-    bps_sym = bps_to_termios_sym(speed)
+    bps_sym = BPS_SYMS[speed]
     # Set I/O speed.
     attrs[ISPEED] = bps_sym
     attrs[OSPEED] = bps_sym
@@ -1392,96 +674,73 @@ def openSerial(port, speed):
     return fd
 
 
-def decodeStatusResponse(response):
+def decodeStatusResponse(response: bytes) -> 'StatusResponse':
     """Decode a POLL response from the terminal"""
     # Ej: 0101 1100 0100 0111  not initialized  RAW: 1011100001111000
     # Ej: 0000 0000 0100 1111  initialized after set mode command
     # RAW: 1000000011111000
 
-    status = StatusResponse()
-
-    statusWordA = int.from_bytes(
-        response[0].encode(), byteorder='big') & 0x3F
-    # 01 1100
-    statusWordB = int.from_bytes(
-        response[1].encode(), byteorder='big') & 0x1F
-    # 0 0111
-
-    statusWord = (reverseByte(statusWordB) << 3) + \
-        (reverseByte(statusWordA) >> 2)
+    # Low bits in the first byte, high bits in the second, LSB first
+    # 01 1100 / 0 0111
+    statusWord = (REVERSED_BITS[response[1] & 0x1F] << 3) + \
+        (REVERSED_BITS[response[0] & 0x3F] >> 2)
     # 11100001110
 
-    # debugLog.write ("DECODED STATUS BYTE A " +
-    # str(reverseByte(statusWordA)) + "\n")
-    # debugLog.write ("DECODED STATUS BYTE B " +
-    # str(reverseByte(statusWordB)) + "\n")
     # debugLog.write ("DECODED STATUS WORD " + str(statusWord) + "\n")
-    # 10000000
-    status.setStationAddress((statusWord & 0x700) >> 8)
-    status.setOutstandingStatus((statusWord & 0x10) >> 4)
-    status.setResponseLevel((statusWord & 0x01))
-
-    status.setBusy((statusWord & 0x80) >> 7)
-    status.setExceptionStatus((statusWord & 0xE) >> 1)
-
-    status.setLineParity((statusWord & 0x40) >> 6)
+    return StatusResponse(
+        (statusWord & 0x700) >> 8,  # stationAddress
+        (statusWord & 0x80) >> 7,   # busy
+        (statusWord & 0x10) >> 4,   # outstandingStatus
+        (statusWord & 0xE) >> 1,    # exceptionStatus
+        statusWord & 0x01,          # responseLevel
+        (statusWord & 0x40) >> 6)   # lineParity
 
-    return status
 
-
-def decodeDataResponse(response):
+def decodeDataResponse(response: bytes) -> int:
     """Decode a data response from the terminal (essentially a
     scancode)
     """
-    dataWordA = int.from_bytes(
-        response[0].encode(), byteorder='big') & 0x3F
-    dataWordB = int.from_bytes(
-        response[1].encode(), byteorder='big') & 0x18
-
-    return (reverseByte(dataWordB) << 3) + (reverseByte(dataWordA) >> 2)
+    return (REVERSED_BITS[response[1] & 0x18] << 3) + \
+        (REVERSED_BITS[response[0] & 0x3F] >> 2)
 
 
 # Class that controls the serial port (USB) for send and receive
 class SerialPortControl:
 
     # Wait for responses from terminals and invoke their processing
-    def waitResponse(self, serialPort, pushToInputQueue, terminal):
+    def waitResponse(self, serialPort: io.BufferedReader, pushToInputQueue: int,
+                     terminal: int) -> bool:
         global debugLog
         global term
         global debugConnection
         while True:
-            fds, wfds, xfds = select.select([serialPort], [], [], 1)
-            if serialPort in fds:
-                ans = serialPort.readline()
-                if "\n" not in ans:
-                    debugLog.write("ERROR, INCOMPLETE LINE: " + ans + "\n")
-
-                ans = ans.replace('\r', '').replace('\n', '')
-                while not ans or "EOTX" not in ans:
-                    if "DEBUG" in ans:
-                        debugLog.write(self.randomString(8) + " " + ans + "\n")
-                    elif len(ans) > 0:
+            if self.serialPoller.poll(1000):
+                raw = serialPort.readline()
+                if not raw.endswith(b"\n"):
+                    debugLog.write("ERROR, INCOMPLETE LINE: " + raw.decode('latin-1') + "\n")
+
+                # Match on the raw bytes, decode only what is logged
+                ans = raw.rstrip(b'\r\n')
+                while b"EOTX" not in ans:
+                    if b"DEBUG" in ans:
+                        debugLog.write(self.randomString(8) + " " + ans.decode('latin-1') + "\n")
+                    elif ans:
                         if debugConnection:
-                            debugLog.write("RECEIVED: " + ans + "\n")
+                            debugLog.write("RECEIVED: " + ans.decode('latin-1') + "\n")
                         if pushToInputQueue:
-                            inputQueue[terminal].put(ans + "\n")
-                    ans = serialPort.readline()
-                    ans = ans.replace('\r', '').replace('\n', '')
-
-                if "EOTX" in ans:
-                    if debugConnection:
-                        debugLog.write("[EOTX]" + "\n")
-                    return True
+                            inputQueue[terminal].append(ans + b"\n")
+                    ans = serialPort.readline().rstrip(b'\r\n')
 
-                debugLog.write("ERROR, NOT EOTX RECEIVED" + "\n")
-                return False
+                if debugConnection:
+                    debugLog.write("[EOTX]" + "\n")
+                return True
             else:
                 debugLog.write("ERROR, NOT EOTX RECEIVED" + "\n")
                 return False
-        return
+        return False
 
     # Send commands to the terminals
-    def write(self, _passarg):
+    def write(self, _passarg) -> None:
         global outputQueue
         global inputQueue
         global outputCommandQueue
@@ -1490,8 +749,10 @@ class SerialPortControl:
         global ttyfile
         fd = openSerial(ttyfile, 57600)
         time.sleep(1)  # wait for Arduino
-        serialPort = os.fdopen(fd, "r")
-        serialPortWrite = os.fdopen(fd, "w")
+        serialPort = os.fdopen(fd, "rb", buffering=65536)
+        self.serialPoller = select.poll()
+        self.serialPoller.register(fd, select.POLLIN)
+        self.serialFd = fd
         # Loop to write to serial interface
 
         lastmicros = [None] * 7
@@ -1508,31 +769,37 @@ class SerialPortControl:
                     # can be throw at it but some emulated terminals will have
                     # a bad day if we poll them too much so in that case we
                     # will specify a minimum polling interval
-                    if lastmicros[terminal.getStationAddress()] is None:
-                        lastmicros[terminal.getStationAddress()] = 0
-
-                    actmicros = int(round(time.time_ns() / 1000));
-
-                    if actmicros < lastmicros[terminal.getStationAddress()] + terminal.getPollDelayUs():
+                    stationAddress = terminal.getStationAddress()
+                    stationInputQueue = inputQueue[stationAddress]
+                    stationOutputQueue = outputQueue[stationAddress]
+                    stationCommandQueue = outputCommandQueue[stationAddress]
+                    lastPoll = lastmicros[stationAddress]
+                    if lastPoll is None:
+                        lastPoll = 0
+
+                    # Monotonic clock, immune to wall clock adjustments
+                    actmicros = time.monotonic_ns() // 1000
+
+                    if actmicros < lastPoll + terminal.getPollDelayUs():
                         continue
-                    lastmicros[terminal.getStationAddress()] = actmicros
+                    lastmicros[stationAddress] = actmicros
 
                     #debugLog.write("POLL AT: " + str(actmicros) + "\n")
 
                     #Dead terminal detection
-                    if term[terminal.getStationAddress()].getInitialized():
-                        if lastmicrosresponse[terminal.getStationAddress()] is not None:
-                            if actmicros > lastmicrosresponse[terminal.getStationAddress()] + 10000000:
+                    if terminal.getInitialized():
+                        if lastmicrosresponse[stationAddress] is not None:
+                            if actmicros > lastmicrosresponse[stationAddress] + 10000000:
                                 debugLog.write("TERMINAL DISCONNECTED: " +
-                                               str(terminal.getStationAddress()) + "\n")
-                                term[terminal.getStationAddress()].reset()
-                                inputQueue[terminal.getStationAddress()].queue.clear();
-                                outputCommandQueue[terminal.getStationAddress()].queue.clear();
-                                outputQueue[terminal.getStationAddress()].queue.clear();
+                                               str(stationAddress) + "\n")
+                                terminal.reset()
+                                stationInputQueue.clear();
+                                terminal.discardCommands()
+                                stationOutputQueue.clear();
 
                                 debugLog.write("TERMINAL RESET DUE TO DISCONNECTION: " +
-                                               str(terminal.getStationAddress()) + "\n")
-                                interceptors[terminal.getStationAddress()].restart()
+                                               str(stationAddress) + "\n")
+                                interceptors[stationAddress].restart()
 
 
 
@@ -1540,44 +807,36 @@ class SerialPortControl:
 
                     # Default action to keep session alive is to poll
                     # continously
-                    if (not term[terminal.getStationAddress()].getPollActive()):
+                    if (not terminal.getPollActive()):
                         terminal.POLL()
-                        term[terminal.getStationAddress()].setPollActive(0)
+                        terminal.setPollActive(0)
                     else:
                         terminal.ACK()
-                        term[terminal.getStationAddress()].setPollActive(0)
+                        terminal.setPollActive(0)
 
-                    if not outputQueue[terminal.getStationAddress()].empty():
-                        towrite = outputQueue[terminal.getStationAddress()].get(
-                        )
+                    if stationOutputQueue:
+                        towrite = stationOutputQueue.popleft()
                         if debugConnection:
-                            debugLog.write("WRITING POLL:" + towrite)
-                        serialPortWrite.write(towrite)
-                    # TBI
-                    while not self.waitResponse(serialPort, 1, terminal.getStationAddress()):
-                        # Retry
-                        debugLog.write("RETRYING POLL: " + towrite + "\n")
-                        serialPortWrite.write(towrite)
-
-                    if not inputQueue[terminal.getStationAddress()].empty():
-                        lastmicrosresponse[terminal.getStationAddress()] = int(round(time.time_ns() / 1000))
-                        self.processResponse(terminal.getStationAddress())
+                            debugLog.write("WRITING POLL:" + towrite.decode())
+                        # TBI
+                        self.sendFrame(serialPort, towrite, 1, stationAddress,
+                                       "RETRYING POLL: ")
+
+                    if stationInputQueue:
+                        lastmicrosresponse[stationAddress] = time.monotonic_ns() // 1000
+                        self.processResponse(stationAddress)
 
                     doNotSendCommands = 0
-                    if not outputQueue[terminal.getStationAddress()].empty():
+                    if stationOutputQueue:
                         # debugLog.write ("ACK\n")
-                        towrite = outputQueue[terminal.getStationAddress()].get(
-                        )
+                        towrite = stationOutputQueue.popleft()
                         if debugConnection:
-                            debugLog.write("WRITING ACK:" + towrite)
-                        serialPortWrite.write(towrite)
-                        while not self.waitResponse(serialPort, 1, terminal.getStationAddress()):
-                            # Retry
-                            debugLog.write("RETRYING ACK: " + towrite + "\n")
-                            serialPortWrite.write(towrite)
-                        if not inputQueue[terminal.getStationAddress()].empty():
-                            #term[terminal.getStationAddress()].setPollActive(0)
-                            self.processResponse(terminal.getStationAddress())
+                            debugLog.write("WRITING ACK:" + towrite.decode())
+                        self.sendFrame(serialPort, towrite, 1, stationAddress,
+                                       "RETRYING ACK: ")
+                        if stationInputQueue:
+                            #terminal.setPollActive(0)
+                            self.processResponse(stationAddress)
                         else:
                             doNotSendCommands = 1
 
@@ -1588,85 +847,113 @@ class SerialPortControl:
 
                     # debugLog.write ("COMMANDS " +str(outputCommandQueue.empty()) + " " + str(term.getBusy())  + "\n")
 
-                    if (not outputCommandQueue[terminal.getStationAddress()].empty()) and (not terminal.getBusy()) and not doNotSendCommands:
-                        #debugLog.write ("SENDING " + str(outputCommandQueue[terminal.getStationAddress()].qsize())  + " COMMANDS\n")
-                        while not outputCommandQueue[terminal.getStationAddress()].empty():
-                            element = outputCommandQueue[terminal.getStationAddress()].get()
-                            if element == "":
-                                # self.processResponse()
+                    if stationCommandQueue and (not terminal.getBusy()) and not doNotSendCommands:
+                        #debugLog.write ("SENDING " + str(len(stationCommandQueue))  + " COMMANDS\n")
+                        # Send one command sequence per pass
+                        try:
+                            sequence = stationCommandQueue.popleft()
+                        except IndexError:
+                            sequence = ()
+                        for element in sequence:
+                            if debugConnection:
+                                debugLog.write("WRITING COMMAND:" + element.decode())
+                            if not self.sendFrame(serialPort, element, 0,
+                                                  stationAddress, "RETRYING: "):
+                                # The commands queued after it depend on it,
+                                # start over from a blank screen
+                                debugLog.write("SCREEN RESYNC: " +
+                                               str(stationAddress) + "\n")
+                                terminal.resyncScreen()
                                 break
-                            else:
-                                if debugConnection:
-                                    debugLog.write("WRITING COMMAND:" + element)
-                                serialPortWrite.write(element)
-                                while not self.waitResponse(serialPort, 0, terminal.getStationAddress()):
-                                    # Retry
-                                    debugLog.write("RETRYING: " + element + "\n")
-                                    serialPortWrite.write(element)
 
         return
 
+    # Send a frame and wait for its EOTX, resending it a bounded number of
+    # times so a silent terminal can't hold the serial loop forever.
+    # The converter handles one line at a time and answers each with EOTX,
+    # so frames can't be gathered into a single write
+    def sendFrame(self, serialPort: io.BufferedReader, data: bytes,
+                  pushToInputQueue: int, stationAddress: int,
+                  retryMessage: str) -> bool:
+        self.sendSerial(data)
+        tries = 0
+        while not self.waitResponse(serialPort, pushToInputQueue, stationAddress):
+            tries += 1
+            if tries > SERIAL_MAX_RETRIES:
+                debugLog.write("GIVING UP: " + data.decode() + "\n")
+                return False
+            time.sleep(min(SERIAL_RETRY_DELAY * (1 << tries),
+                           SERIAL_RETRY_MAX_DELAY))
+            debugLog.write(retryMessage + data.decode() + "\n")
+            self.sendSerial(data)
+        return True
+
+    # Write a complete command line straight to the serial fd
+    def sendSerial(self, data: bytes) -> None:
+        view = memoryview(data)
+        while view:
+            try:
+                view = view[os.write(self.serialFd, view):]
+            except BlockingIOError:
+                # The port is opened non blocking, wait until it drains
+                select.select([], [self.serialFd], [])
+
     # Utility to generate random string to keep log lines correlation when
     # needed for debugging purposes
-    def randomString(self, stringLength=4):
-        letters = string.ascii_lowercase
-        return ''.join(random.choice(letters) for i in range(stringLength))
+    def randomString(self, stringLength: int = 4) -> str:
+        return os.urandom((stringLength + 1) // 2).hex()[:stringLength]
 
     # Process response from a terminal
     # essentially status and scancodes
-    def processResponse(self, terminal):
+    def processResponse(self, terminal: int) -> None:
         # global the5250log
         global inputQueue, outputCommandQueue, outputQueue
         global term
         global debugLog
         global debugKeystrokes
         global debugConnection
-        if not inputQueue[terminal].empty():
+        if inputQueue[terminal]:
             # Get poll status and keystrokes
             # Generally we won't be reading anything from the terminal other
             # than polling statuses
             # So this logic is very simplified
-            firstWord = inputQueue[terminal].get()
+            firstWord = inputQueue[terminal].popleft()
             # the5250log.write(firstWord)
             status = decodeStatusResponse(firstWord)
 
             if debugConnection:
                 id = self.randomString()
-                debugLog.write(id + " RECEIVED STATUS WORD: " + firstWord)
-                debugLog.write(id + "   stationAddress: " +
-                               str(status.getStationAddress()) + "\n")
-                debugLog.write(id + "   busy: " + str(status.getBusy()) + "\n")
-                debugLog.write(id + "   outstandingStatus: " +
-                               str(status.getOutstandingStatus()) + "\n")
-                debugLog.write(id + "   exceptionStatus: " +
-                               str(status.getExceptionStatus()) + "\n")
-                debugLog.write(id + "   responseLevel: " +
-                               str(status.getResponseLevel()) + "\n")
-                debugLog.write(id + "   lineParity: " +
-                               str(status.getLineParity()) + "\n")
-
-            term[terminal].setBusy(status.getBusy())
-
-            term[terminal].setLineParity(status.getLineParity())
+                debugLog.write(
+                    f"{id} RECEIVED STATUS WORD: {firstWord.decode('latin-1')}"
+                    f"{id}   stationAddress: {status.stationAddress}\n"
+                    f"{id}   busy: {status.busy}\n"
+                    f"{id}   outstandingStatus: {status.outstandingStatus}\n"
+                    f"{id}   exceptionStatus: {status.exceptionStatus}\n"
+                    f"{id}   responseLevel: {status.responseLevel}\n"
+                    f"{id}   lineParity: {status.lineParity}\n")
+
+            term[terminal].setBusy(status.busy)
+
+            term[terminal].setLineParity(status.lineParity)
 
             term[terminal].setPollActive(1);
 
             hasSecondWord = False;
 
-            if not inputQueue[terminal].empty():
-                secondWord = inputQueue[terminal].get()
+            if inputQueue[terminal]:
+                secondWord = inputQueue[terminal].popleft()
                 hasSecondWord = True
 
-            if inputQueue[terminal].empty() and \
-                    (status.getExceptionStatus() == 7):
+            if not inputQueue[terminal] and \
+                    (status.exceptionStatus == 7):
                 # Terminal detected but needs to be initialized
 
                 # Reset terminal
 
                 term[terminal].setInitialized(0)
-                inputQueue[terminal].queue.clear();
-                outputCommandQueue[terminal].queue.clear();
-                outputQueue[terminal].queue.clear();
+                inputQueue[terminal].clear();
+                term[terminal].discardCommands()
+                outputQueue[terminal].clear();
                 debugLog.write("TERMINAL RESET BEFORE INITIALIZATION: " +
                                str(terminal) + "\n")
                 interceptors[terminal].restart()
@@ -1684,9 +971,9 @@ class SerialPortControl:
 
                 return
 
-            elif (status.getExceptionStatus() == 0 and \
+            elif (status.exceptionStatus == 0 and \
                     not term[terminal].getInitialized() and \
-                    not status.getBusy()):
+                    not status.busy):
                 # Clear screen and init shell
                 term[terminal].setInitialized(1)
                 debugLog.write("STARTING SHELL FOR DETECTED TERMINAL: " +
@@ -1696,24 +983,25 @@ class SerialPortControl:
                     interceptors[terminal].arranque, (None,))
 
                 if not term[terminal].getResponseLevel() == \
-                        status.getResponseLevel():
+                        status.responseLevel:
                     term[terminal].setResponseLevel(
-                        status.getResponseLevel())
+                        status.responseLevel)
                 return
 
-            elif status.getExceptionStatus() != 0 and \
+            elif status.exceptionStatus != 0 and \
                     term[terminal].getInitialized():
                 # Exception, log and send a reset command
 
                 debugLog.write("TERMINAL:" + str(terminal) +
                                " SENT AN EXCEPTION CODE: " +
-                               str(status.getExceptionStatus()) + "\n")
+                               str(status.exceptionStatus) + "\n")
                 term[terminal].resetException()
-            elif status.getExceptionStatus() == 0 and term[terminal].getInitialized():
+            elif status.exceptionStatus == 0 and term[terminal].getInitialized():
                 if hasSecondWord:
                     if len(secondWord) >= 2:
                         if debugConnection:
-                            debugLog.write("RECEIVED DATA WORD: " + secondWord)
+                            debugLog.write("RECEIVED DATA WORD: " +
+                                           secondWord.decode('latin-1'))
                         # the5250log.write(secondWord)
                         scancode = decodeDataResponse(secondWord)
                         # debugLog.write ("RECEIVED DATA BYTE: " +
@@ -1724,23 +1012,22 @@ class SerialPortControl:
                         # hex(scancode) + " RLEVEL: " +
                         # str(term.getResponseLevel()) + "\n")
                         if ((not term[terminal].getResponseLevel() ==
-                                status.getResponseLevel()) and
+                                status.responseLevel) and
                                 (scancode != 0x00) and (scancode != 0xFF)):
                             term[terminal].setResponseLevel(
-                                status.getResponseLevel())
+                                status.responseLevel)
                             if debugKeystrokes:
-                                debugLog.write("RECEIVED SCANCODE: " +
-                                               hex(scancode) +
-                                               " FROM TERMINAL: " +
-                                               str(terminal) + "\n")
+                                debugLog.write(
+                                    f"RECEIVED SCANCODE: {scancode:#x}"
+                                    f" FROM TERMINAL: {terminal}\n")
                             # Convert scancode and send to the SHELL
                             if scancode != "":
                                 # Send to SHELL
                                 term[terminal].processScanCode(scancode)
                         if not term[terminal].getResponseLevel() == \
-                                status.getResponseLevel():
+                                status.responseLevel:
                             term[terminal].setResponseLevel(
-                                status.getResponseLevel())
+                                status.responseLevel)
 
             # Send ACK if it is needed to indicate to the 5250 we have read
             # its status
@@ -1757,55 +1044,19 @@ class SerialPortControl:
 
 # Class to hold the status decoded from a POLL response
 class StatusResponse():
-    def __init__(self):
-        self.stationAddress = 0
-        self.busy = 0
-        self.outstandingStatus = 0
-        self.exceptionStatus = 0
-        self.responseLevel = 0
-        self.lineParity = 0
-        return
-
-    def getStationAddress(self):
-        return self.stationAddress
-
-    def setStationAddress(self, value):
-        self.stationAddress = value
-        return
-
-    def getBusy(self):
-        return self.busy
-
-    def setBusy(self, busy):
+    # One of these is built per poll response, keep it small
+    __slots__ = ('stationAddress', 'busy', 'outstandingStatus',
+                 'exceptionStatus', 'responseLevel', 'lineParity')
+
+    def __init__(self, stationAddress: int, busy: int,
+                 outstandingStatus: int, exceptionStatus: int,
+                 responseLevel: int, lineParity: int):
+        self.stationAddress = stationAddress
         self.busy = busy
-        return
-
-    def getOutstandingStatus(self):
-        return self.outstandingStatus
-
-    def setOutstandingStatus(self, value):
-        self.outstandingStatus = value
-        return
-
-    def getExceptionStatus(self):
-        return self.exceptionStatus
-
-    def setExceptionStatus(self, value):
-        self.exceptionStatus = value
-        return
-
-    def getResponseLevel(self):
-        return self.responseLevel
-
-    def setResponseLevel(self, value):
-        self.responseLevel = value
-        return
-
-    def getLineParity(self):
-        return self.lineParity
-
-    def setLineParity(self, value):
-        self.lineParity = value
+        self.outstandingStatus = outstandingStatus
+        self.exceptionStatus = exceptionStatus
+        self.responseLevel = responseLevel
+        self.lineParity = lineParity
         return
 
 
@@ -1868,13 +1119,10 @@ class MyPrompt(cmd.Cmd):
         ctrlscancode = term[cmd.Cmd.activeTerminal].scancodeDictionary['CTRL_PRESS'][0]
         term[cmd.Cmd.activeTerminal].processScanCode(ctrlscancode)
 
-        for i in range(0, len(string)):
-            for key, value in term[cmd.Cmd.activeTerminal].scancodeDictionary.items():
-                try:
-                    if value[0] == string[i]:
-                        term[cmd.Cmd.activeTerminal].processScanCode(key)
-                except:
-                    pass
+        keysByCharacter = term[cmd.Cmd.activeTerminal].keysByCharacter
+        for char in string:
+            for key in keysByCharacter.get(char, ()):
+                term[cmd.Cmd.activeTerminal].processScanCode(key)
         if len(term[cmd.Cmd.activeTerminal].scancodeDictionary['CTRL_RELEASE']):
             ctrlscancode = term[cmd.Cmd.activeTerminal].scancodeDictionary['CTRL_RELEASE'][0]
             term[cmd.Cmd.activeTerminal].processScanCode(ctrlscancode)
@@ -1885,13 +1133,10 @@ class MyPrompt(cmd.Cmd):
         ctrlscancode = term[cmd.Cmd.activeTerminal].scancodeDictionary['ALT_PRESS'][0]
         term[cmd.Cmd.activeTerminal].processScanCode(ctrlscancode)
 
-        for i in range(0, len(string)):
-            for key, value in term[cmd.Cmd.activeTerminal].scancodeDictionary.items():
-                try:
-                    if value[0] == string[i].lower():
-                        term[cmd.Cmd.activeTerminal].processScanCode(key)
-                except:
-                    pass
+        keysByCharacter = term[cmd.Cmd.activeTerminal].keysByCharacter
+        for char in string:
+            for key in keysByCharacter.get(char.lower(), ()):
+                term[cmd.Cmd.activeTerminal].processScanCode(key)
         # Release if enabled
         if len(term[cmd.Cmd.activeTerminal].scancodeDictionary['ALT_RELEASE']):
             ctrlscancode = term[cmd.Cmd.activeTerminal].scancodeDictionary['ALT_RELEASE'][0]
@@ -1931,12 +1176,12 @@ class MyPrompt(cmd.Cmd):
             for col in range(16):
                 char = col << 4 | row
                 if col in [2, 3]: # char is an attribute
-                    t.txEbcdic([char])
+                    t.txEbcdic(bytes((char,)))
                     t.txString(f"{char:02X}")
-                    t.txEbcdic([CLEAR_ATTRIBUTES, SPACE])
+                    t.txEbcdic(bytes((CLEAR_ATTRIBUTES, SPACE)))
                 else:
                     t.txString(f" {char:02X}:")
-                    t.txEbcdic([char])
+                    t.txEbcdic(bytes((char,)))
             t.CR()
             t.LF()
 
@@ -2177,20 +1422,22 @@ class MyPrompt(cmd.Cmd):
     def do_tx(self, inp):
         print("Transmitting '{}'".format(inp))
         global outputCommandQueue
-        outputCommandQueue[cmd.Cmd.activeTerminal].put(inp + "\n")
-        outputCommandQueue[cmd.Cmd.activeTerminal].put("")
+        t = term[cmd.Cmd.activeTerminal]
+        with t.pendingCommandsLock:
+            t.forgetCounters()
+            outputCommandQueue[cmd.Cmd.activeTerminal].append(
+                [(inp + "\n").encode()])
         return
 
     def do_decodeStringData(self, inp):
-        print("TRANSLATING:" + str(inp) + " " + str(len(inp)) + "\n")
+        print(f"TRANSLATING:{inp} {len(inp)}\n")
         for i in range(0, len(inp), 2):
 
             dataWordA = int.from_bytes(inp[i].encode(), byteorder='big') & 0x3F
             dataWordB = int.from_bytes(
                 inp[i + 1].encode(), byteorder='big') & 0x3
             resultado = (dataWordB << 6) + (dataWordA)
-            print("RESULTADO: " + str(inp[i]) + " " +
-                  str(inp[i + 1]) + " " + str(resultado) + "\n")
+            print(f"RESULTADO: {inp[i]} {inp[i + 1]} {resultado}\n")
         return
 
     def do_EOF(self, inp):
@@ -2210,15 +1457,19 @@ class MyPrompt(cmd.Cmd):
         """Enter a Python interpreter (read-eval-print loop).
 
         Note: Interaction with terminals using this interpreter is
-        timing-sensitive due to the use of threads, e.g. this has the
+        timing-sensitive due to the use of threads. transmitCommand only
+        adds a command to the terminal's pending sequence, which is
+        queued for the serial port when EOQ ends it, e.g. this has the
         same effect as the 'txebcdic' example:
 
-          b = bytearray([4, 33, 200, 201, 32])
+          b = bytes([4, 33, 200, 201, 32])
           term[0].transmitCommand(WRITE_DATA_LOAD_CURSOR, 0, b); term[0].EOQ()
 
-        but invoking the two statements on the second line with a
-        delay between them results in the EOQ command never being
-        sent.
+        but with a delay between the two statements on the second line,
+        shell output or a keystroke may end the pending sequence first.
+        The write is then sent along with those commands, at whatever
+        position they left the address counter, and the EOQ finds
+        nothing left to end.
         """
         code.interact(local=globals(),
                       banner="""\
@@ -2227,13 +1478,85 @@ Interactive Python interpreter (read-eval-print loop)
                       exitmsg="Returning from Python interpreter to CLI")
 
 
-def chunks(l, n):
-    n = max(1, n)
-    return (l[i:i+n] for i in range(0, len(l), n))
+# Builds a 256 byte translation table from Latin-1 to the given single byte
+# EBCDIC codepage with the layout custom conversions applied on top.
+# Characters the codepage can't encode become blanks, as in txString.
+# Returns None if the codepage isn't a single byte one
+def buildEbcdicTable(codepage, conversions):
+    blank = " ".encode(codepage)
+    table = bytearray()
+    for i in range(256):
+        try:
+            encoded = chr(i).encode(codepage)
+        except UnicodeEncodeError:
+            encoded = blank
+        if len(encoded) != 1:
+            return None
+        table += encoded
+    for char, ebcdic in conversions.items():
+        if ord(char) < 256:
+            table[ord(char)] = ebcdic
+    return bytes(table)
+
+
+# Codec error handler for the EBCDIC codepages. Characters that can't be
+# encoded are transmitted as blanks, one per character, to keep the session
+# in sync
+EBCDIC_ERRORS = '5250_blank'
+
+
+def ebcdicBlankErrors(error):
+    return (' ' * (error.end - error.start), error.end)
+
+
+codecs.register_error(EBCDIC_ERRORS, ebcdicBlankErrors)
+
 
+# Bit reversed value of every byte, the 5250 sends the bits LSB first
+REVERSED_BITS = bytes(int('{:08b}'.format(byte)[::-1], 2)
+                      for byte in range(256))
 
-def reverseByte(byte):
-    return int('{:08b}'.format(byte)[::-1], 2)
+
+# Serial encoding of the data bytes of a command. The low six bits go in one
+# byte (0x7F becomes 0x3F, weird bug with DEL chars) and the high two bits go
+# with the station address in the next one, one table per address
+DATA_LOW_BITS = bytes(0x3F if (byte & 0x3F) + 0x40 == 0x7F
+                      else (byte & 0x3F) + 0x40 for byte in range(256))
+DATA_HIGH_BITS = tuple(
+    bytes(((byte & 0xC0) >> 6) + (address << 2) + 0x40 for byte in range(256))
+    for address in range(8))
+
+# First two bytes of every command line, indexed by station address and
+# command. The second byte is encoded like the high bits of a data byte
+COMMAND_HEADERS = tuple(
+    tuple(bytes(((command & 0x3F) + 0x40, DATA_HIGH_BITS[address][command]))
+          for command in range(256))
+    for address in range(8))
+
+
+# VT52 escape codes that are accepted but do nothing on a 5250 (ESC b, ESC c,
+# ESC v and ESC w: foreground/background colour and line wrap)
+IGNORED_ESCAPE_CODES = frozenset((98, 99, 118, 119))
+
+
+# 5250 buffer address of every position of the 24x80 screen, as sent in the
+# load address and cursor commands
+ENCODED_POSITIONS = tuple(position.to_bytes(2, byteorder='big')
+                          for position in range(24 * 80))
+
+# Single byte command payloads, indexed by their value
+BYTE_PAYLOADS = tuple(bytes((value,)) for value in range(256))
+
+# Fixed positions used by the clear and scroll commands
+UPPER_LEFT_CORNER = ENCODED_POSITIONS[0]
+LOWER_RIGHT_CORNER = ENCODED_POSITIONS[23 * 80 + 79]
+PENULTIMATE_LINE_END = ENCODED_POSITIONS[22 * 80 + 79]
+LAST_LINE_START = ENCODED_POSITIONS[23 * 80]
+
+
+# Characters txStringWithEscapeChars acts on, anything else is regular text:
+# BEL, BS, HT, LF, VT, FF, CR and ESC
+PARSER_CONTROL_PATTERN = re.compile(b'[\x07-\x0d\x1b]')
 
 
 # Class that implments the VT52 to 5250 conversion and holds the terminal
@@ -2245,6 +1568,21 @@ class VT52_to_5250():
         self.EBCDICcodepage = EBCDICcodepage
         self.destinationAddr = address
         self.scancodeDictionary = scancodeDictionaries[scancodeDictionary]
+        # Bind the layout tables once
+        self.scancodeTable, self.specialKeys, self.keySequenceOffset, \
+            modifierKeys, self.keysByCharacter = \
+            getLayoutTables(scancodeDictionary)
+        # Bound handler of each special key scancode
+        self.modifierHandlers = {scancode: getattr(self, handler)
+                                 for scancode, handler in modifierKeys.items()}
+        # Layouts without a release key for CTRL or ALT use the press key as
+        # a toggle, and the modifier is dropped after the next key
+        self.ctrlReleaseEmpty = not self.specialKeys.ctrlRelease
+        self.altReleaseEmpty = not self.specialKeys.altRelease
+        self.customConversions = self.scancodeDictionary.get(
+            'CUSTOM_CHARACTER_CONVERSIONS', {})
+        self.ebcdicTable = buildEbcdicTable(
+            EBCDICcodepage, self.customConversions)
         self.cursorX = 0
         self.cursorY = 0
         self.savedCursorX = 0
@@ -2265,6 +1603,40 @@ class VT52_to_5250():
         self.savedNewlinePending = 0
         self.savedCursorInPreviousLine = 0
         self.incompleteSequence = bytearray()
+        # Commands of the sequence being built, queued together at its end.
+        # Commands can come from the shell, serial and CLI threads
+        self.pendingCommands = []
+        self.pendingCommandsLock = _thread.allocate_lock()
+        # Clearing and scrolling the whole screen are always the same command
+        # sequences for a terminal, encode them only once
+        self.clearScreenSequence = self.encodeSequence((
+            # Move address counter to upper left corner
+            (LOAD_ADDRESS_COUNTER, UPPER_LEFT_CORNER),
+            # Move reference counter to lower right corner
+            (LOAD_REFERENCE_COUNTER, LOWER_RIGHT_CORNER),
+            # Send clear command
+            (CLEAR, b''),
+            # Cursor and address counter to upper left corner
+            (LOAD_CURSOR_REGISTER, UPPER_LEFT_CORNER),
+            (LOAD_ADDRESS_COUNTER, UPPER_LEFT_CORNER)))
+        self.scrollUpSequences = (
+            # Lines below the first one go one line up
+            self.encodeSequence((
+                (LOAD_REFERENCE_COUNTER, UPPER_LEFT_CORNER),
+                (LOAD_ADDRESS_COUNTER, ENCODED_POSITIONS[80]),
+                (LOAD_CURSOR_REGISTER, LOWER_RIGHT_CORNER),
+                (MOVE_DATA, b''))),
+            # Clear last line
+            self.encodeSequence((
+                (LOAD_ADDRESS_COUNTER, LAST_LINE_START),
+                (LOAD_REFERENCE_COUNTER, LOWER_RIGHT_CORNER),
+                (CLEAR, b''))))
+        # Status byte writes only differ in their payload, keep the frame for
+        # every value
+        self.statusByteFrames = tuple(
+            self.encodeCommand(WRITE_CONTROL_DATA, address, payload, 0)
+            for payload in BYTE_PAYLOADS)
+        self.forgetCounters()
         self.clickerEnabled = clickerEnabled
         self.advancedFeatures = advancedFeatures
         self.statusByte = 0
@@ -2312,7 +1684,10 @@ class VT52_to_5250():
         self.cursorInPreviousLine = 0
         self.savedNewlinePending = 0
         self.savedCursorInPreviousLine = 0
-        self.incompleteSequence = bytearray()
+        self.incompleteSequence.clear()
+        with self.pendingCommandsLock:
+            self.pendingCommands = []
+            self.forgetCounters()
         self.statusByte = 0
         # Meaning of each statusByte bits:
         # 0x80 Hide cursor
@@ -2347,8 +1722,7 @@ class VT52_to_5250():
             self.clickerEnabled = True
             self.statusByte = self.statusByte & 0xFD
         # tx to terminal
-        self.transmitCommand(WRITE_CONTROL_DATA, self.destinationAddr, [
-                             self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
@@ -2403,239 +1777,172 @@ class VT52_to_5250():
     # Extracts escape chars from string and calls the adequate method to
     # convert them to 5250 commands
     def txStringWithEscapeChars(self, string):
-        stringArray = bytearray(string.encode())
-        stringToTxArray = bytearray()
+        data = string.encode()
 
-        if len(self.incompleteSequence) > 0:
-            stringArray = self.incompleteSequence + stringArray
-            self.incompleteSequence = bytearray()
+        # The buffer for an incomplete sequence is kept and reused
+        if self.incompleteSequence:
+            data = bytes(self.incompleteSequence) + data
+            self.incompleteSequence.clear()
             # debugLog.write ("COMPLETING ESCAPE SEQUENCE\n")
 
-        while len(stringArray) > 0:
-            character = stringArray.pop(0)
+        # Walk the data with an index. Regular characters are transmitted in
+        # runs, data[textStart:] up to the next control character; text
+        # around a BEL is kept in heldText so the run isn't split
+        length = len(data)
+        textStart = 0
+        heldText = b''
+        i = 0
+        search = PARSER_CONTROL_PATTERN.search
+        while i < length:
+            # Jump over the regular characters to the next one that needs
+            # handling, the scan runs in the regex engine
+            match = search(data, i)
+            if match is None:
+                break
+            i = match.start()
+            character = data[i]
+            i += 1
             if character == 0x1b:
                 # ESC escape
-                if len(stringToTxArray) > 0:
+                if heldText or textStart < i - 1:
                     # If a escape sequence start is detected we first transmit
                     # the string characters we have already stored
-                    self.txString(stringToTxArray.decode())
-                    stringToTxArray = bytearray()
-                if len(stringArray) == 0:
+                    self.txString((heldText + data[textStart:i - 1]).decode())
+                    heldText = b''
+                escapeStart = i - 1
+                if i == length:
                     # It seems the escape sequence is incomplete and the rest
                     # will be received in the next string
                     # debugLog.write ("INCOMPLETE ESCAPE SEQUENCE\n")
-                    self.incompleteSequence = bytearray()
-                    self.incompleteSequence.append(0x1b)
-                    continue
-                character2 = stringArray.pop(0)
+                    self.incompleteSequence[:] = data[escapeStart:]
+                    return
+                character2 = data[i]
+                i += 1
 
                 if character2 == 0x5B:
-                    # ANSI sequence
-                    if len(stringArray) == 0:
+                    # ANSI sequence, only ESC [ 2 J (clear screen) is known
+                    if data.startswith(b'2J', i):
+                        self.ESC_E()
+                        i += 2
+                        textStart = i
+                        continue
+                    if length - i < 2 and b'2J'.startswith(data[i:]):
                         # It seems the escape sequence is incomplete and the
                         # rest will be received in the next string
                         # debugLog.write ("INCOMPLETE ANSI ESCAPE SEQUENCE\n")
-                        self.incompleteSequence = bytearray()
-                        self.incompleteSequence.append(0x1b)
-                        self.incompleteSequence.append(0x5B)
-                        continue
-                    character2 = stringArray.pop(0)
+                        self.incompleteSequence[:] = data[escapeStart:]
+                        return
+                    character2 = data[i]
+                    i += 1
                     if character2 == 0x32:
-                        if len(stringArray) == 0:
-                            # It seems the escape sequence is incomplete and
-                            # the rest will be received in the next string
-                            # debugLog.write
-                            # ("INCOMPLETE ANSI ESCAPE SEQUENCE\n")
-                            self.incompleteSequence = bytearray()
-                            self.incompleteSequence.append(0x1b)
-                            self.incompleteSequence.append(0x5B)
-                            self.incompleteSequence.append(0x32)
-                            continue
-                        character3 = stringArray.pop(0)
-                        if character3 == 0x4A:
-                            self.ESC_E()
-                            continue
-
-                if character2 == 74:
-                    self.ESC_J()
-                elif character2 == 75:
-                    self.ESC_K()
-                elif character2 == 69:
-                    self.ESC_E()
-                elif character2 == 108:
-                    self.ESC_l()
-                elif character2 == 111:
-                    self.ESC_o()
-                elif character2 == 100:
-                    self.ESC_d()
-                elif character2 == 66:
-                    self.ESC_B()
-                elif character2 == 72:
-                    self.ESC_H()
-                elif character2 == 68:
-                    self.ESC_D()
-                elif character2 == 67:
-                    self.ESC_C()
-                elif character2 == 65:
-                    self.ESC_A()
-                elif character2 == 77:
-                    self.ESC_M()
+                        # ESC [ 2 and something else, drop it
+                        i += 1
+
+                handler = self.ESC_HANDLERS.get(character2)
+                if handler is not None:
+                    handler(self)
                 elif character2 == 89:
-                    if len(stringArray) == 0:
+                    if i + 1 >= length:
                         # It seems the escape sequence is incomplete and the
                         # rest will be received in the next string
                         # debugLog.write ("INCOMPLETE ESC_M SEQUENCE\n")
-                        self.incompleteSequence = bytearray()
-                        self.incompleteSequence.append(0x1b)
-                        self.incompleteSequence.append(89)
-                        continue
-                    character3 = stringArray.pop(0)
-                    if len(stringArray) == 0:
-                        # It seems the escape sequence is incomplete and the
-                        # rest will be received in the next string
-                        # debugLog.write ("INCOMPLETE ESC_M SEQUENCE\n")
-                        self.incompleteSequence = bytearray()
-                        self.incompleteSequence.append(0x1b)
-                        self.incompleteSequence.append(89)
-                        self.incompleteSequence.append(character3)
-                        continue
-                    character4 = stringArray.pop(0)
-                    self.ESC_Y(character3 - 32, character4 - 32)
-                elif character2 == 98:
-                    self.ESC_b()
-                elif character2 == 76:
-                    self.ESC_L()
-                elif character2 == 107:
-                    self.ESC_k()
-                elif character2 == 99:
-                    self.ESC_c()
-                elif character2 == 113:
-                    self.ESC_q()
-                elif character2 == 112:
-                    self.ESC_p()
-                elif character2 == 106:
-                    self.ESC_j()
-                elif character2 == 73:
-                    self.ESC_I()
-                elif character2 == 119:
-                    self.ESC_w()
-                elif character2 == 118:
-                    self.ESC_v()
-                elif character2 == 101:
-                    self.ESC_e()
-                elif character2 == 102:
-                    self.ESC_f()
+                        self.incompleteSequence[:] = data[escapeStart:]
+                        return
+                    self.ESC_Y(data[i] - 32, data[i + 1] - 32)
+                    i += 2
+                elif character2 in IGNORED_ESCAPE_CODES:
+                    # Colour and wrap settings have no 5250 equivalent, skip
+                    # them without calling their empty handlers
+                    pass
                 else:
                     # Received something we have not implemented
-                    debugLog.write("UNKNOWN ESCAPE CODE: " +
-                                   str(character2) + "\n")
+                    debugLog.write(f"UNKNOWN ESCAPE CODE: {character2}\n")
+                textStart = i
+
+            elif character == 0x07:  # BELL
+                # Bell, doesn't interrupt the text being stored
+                heldText += data[textStart:i - 1]
+                textStart = i
+                self.BEL()
 
             else:
                 # Something that is not an escape sequence but needs to be
                 # converted to 5250 commands
-                if character == 0x0D:
-                    # Carru return
-                    if len(stringToTxArray) > 0:
-                        self.txString(stringToTxArray.decode())
-                        stringToTxArray = bytearray()
-                    self.CR()
-                elif character == 0x0A:
-                    # Line feed
-                    if len(stringToTxArray) > 0:
-                        self.txString(stringToTxArray.decode())
-                        stringToTxArray = bytearray()
-                    self.LF()
-                elif character == 0x09:
-                    # Horizontal tabulator
-                    if len(stringToTxArray) > 0:
-                        self.txString(stringToTxArray.decode())
-                        stringToTxArray = bytearray()
-                    self.HT()
-                elif character == 0x08:
-                    # Backspace
-                    if len(stringToTxArray) > 0:
-                        self.txString(stringToTxArray.decode())
-                        stringToTxArray = bytearray()
-                    self.BS()
-                elif character == 0x07:  # BELL
-                    # Bell
-                    self.BEL()
-                    continue
-                else:
-                    # Regular ASCII char, store to transmit
-                    stringToTxArray.append(character)
+                if heldText or textStart < i - 1:
+                    self.txString((heldText + data[textStart:i - 1]).decode())
+                    heldText = b''
+                textStart = i
+                self.CONTROL_HANDLERS[character](self)
 
-        if len(stringToTxArray) > 0:
-            self.txString(stringToTxArray.decode())
+        if heldText or textStart < length:
+            self.txString((heldText + data[textStart:]).decode())
         return
 
     def txString(self, string):
         # Converts to EBCDIC and transmits an ASCII string
-        ebcdicArray = bytearray()
-        for char in string:
+        if self.ebcdicTable is not None:
+            # Fast path, anything in Latin-1 is a single table translation
             try:
-                # Some custom character translations
-                if 'CUSTOM_CHARACTER_CONVERSIONS' in self.scancodeDictionary and char in self.scancodeDictionary['CUSTOM_CHARACTER_CONVERSIONS']:
-                    ebcdicArray.append(
-                        self.scancodeDictionary['CUSTOM_CHARACTER_CONVERSIONS'][char])
-
-                else:
-                    ebcdicArray = ebcdicArray + \
-                        char.encode(self.EBCDICcodepage)
+                self.txEbcdic(
+                    string.encode('latin-1').translate(self.ebcdicTable))
+                return
             except UnicodeEncodeError:
-                # In anything goes wrong (strange character or some shit)
-                # transmit a blank to keep session on sync
-                ebcdicArray = ebcdicArray + " ".encode(self.EBCDICcodepage)
+                pass
+        # Characters outside Latin-1 or a multibyte codepage, let the codec
+        # do the conversion
+        conversions = self.customConversions
+        if not conversions:
+            self.txEbcdic(string.encode(self.EBCDICcodepage, EBCDIC_ERRORS))
+            return
+        ebcdicArray = bytearray()
+        for char in string:
+            # Some custom character translations
+            ebcdic = conversions.get(char)
+            if ebcdic is not None:
+                ebcdicArray.append(ebcdic)
+            else:
+                ebcdicArray += char.encode(self.EBCDICcodepage, EBCDIC_ERRORS)
         self.txEbcdic(ebcdicArray)
 
     def txEbcdic(self, ebcdicArray):
+        # Bound once, this loop runs for every 10 chars written
+        transmitCommand = self.transmitCommand
+        incrementCursor = self.incrementCursor
+        endQueue = self.EOQ
+        destination = self.destinationAddr
         # Split in chunks of 10 or less so that the string fits into the 5250
-        # command buffer
-        pieces = chunks(ebcdicArray, 10)
-        i = 1
-        for piece in pieces:
-            i = i+1
+        # command buffer. Slices of the view don't copy, the only copy is
+        # the length prefixed payload
+        view = memoryview(ebcdicArray)
+        for start in range(0, len(view), 10):
+            piece = view[start:start + 10]
+            pieceLength = len(piece)
+            charsToEndOfScreen = 1920 - (80 * self.cursorX + self.cursorY)
             # Check if we are writing over the screen buffer. In that case
             # we need to insert a new line
-            if len(piece) > self.getCharsToEndOfScreen():
-
-                # write self.getCharsToEndOfScreen() chars
-                first = piece[:self.getCharsToEndOfScreen()]
-                second = piece[self.getCharsToEndOfScreen():]
+            if pieceLength > charsToEndOfScreen:
 
-                first2 = bytearray(first)
-                first2.insert(0, len(first))
-                second2 = bytearray(second)
-                second2.insert(0, len(second))
+                # write charsToEndOfScreen chars
+                first = piece[:charsToEndOfScreen]
+                second = piece[charsToEndOfScreen:]
 
                 if len(first) > 0:
-                    self.transmitCommand(
-                        WRITE_DATA_LOAD_CURSOR, self.destinationAddr, first2)
-                    self.incrementCursor(len(first))
-                    self.EOQ()
+                    transmitCommand(WRITE_DATA_LOAD_CURSOR, destination,
+                                    bytes((len(first),)) + first)
+                    incrementCursor(len(first))
+                    endQueue()
 
                 # write rest of chars
                 if len(second) > 0:
                     # delete first line
-                    self.cursorX = 0
-                    self.cursorY = 0
-                    # self.EOQ()
-                    self.ESC_M()
-                    self.cursorX = 23
-                    self.cursorY = 0
-                    self.transmitCommand(LOAD_CURSOR_REGISTER,
-                                         self.destinationAddr,
-                                         self.getEncodedCursorPosition())
-                    self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                                         self.destinationAddr,
-                                         self.getEncodedCursorPosition())
-                    self.EOQ()
+                    self.positionCursor(23, 0)
+                    self.scrollUp()
 
                     # txstring
-                    self.transmitCommand(
-                        WRITE_DATA_LOAD_CURSOR, self.destinationAddr, second2)
-                    self.incrementCursor(len(second))
-                    self.EOQ()
+                    transmitCommand(WRITE_DATA_LOAD_CURSOR, destination,
+                                    bytes((len(second),)) + second)
+                    incrementCursor(len(second))
+                    endQueue()
 
             else:
 
@@ -2647,39 +1954,22 @@ class VT52_to_5250():
                 # already in the last line
                 if self.newlinePending:
                     # delete first line
-                    self.cursorX = 0
-                    self.cursorY = 0
-                    # self.EOQ()
-                    self.ESC_M()
-                    self.cursorX = 23
-                    self.cursorY = 0
-                    self.transmitCommand(LOAD_CURSOR_REGISTER,
-                                         self.destinationAddr,
-                                         self.getEncodedCursorPosition())
-                    self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                                         self.destinationAddr,
-                                         self.getEncodedCursorPosition())
-                    self.EOQ()
-                    self.newlinePending = False
-                    self.cursorInPreviousLine = False
-
-                setNewLinePending = False
-                setCursorInPreviousLine = False
-
-                if len(piece) == self.getCharsToEndOfLine():
-                    # Cursor in Vt52 will be in the position x-1,79 regarding
-                    # cursor movement
-                    setCursorInPreviousLine = True
+                    self.positionCursor(23, 0)
+                    self.scrollUp()
+                    charsToEndOfScreen = self.getCharsToEndOfScreen()
 
-                if len(piece) == self.getCharsToEndOfScreen():
-                    setNewLinePending = True
+                # Cursor in Vt52 will be in the position x-1,79 regarding
+                # cursor movement
+                setCursorInPreviousLine = pieceLength == 80 - self.cursorY
 
-                piece2 = bytearray(piece)
-                piece2.insert(0, len(piece))
-                self.transmitCommand(WRITE_DATA_LOAD_CURSOR,
-                                     self.destinationAddr, piece2)
-                self.incrementCursor(len(piece))
-                self.EOQ()
+                setNewLinePending = pieceLength == charsToEndOfScreen
+
+                # Length prefixed data, built in one go rather than
+                # inserting the length in front of a copy
+                transmitCommand(WRITE_DATA_LOAD_CURSOR, destination,
+                                bytes((pieceLength,)) + piece)
+                incrementCursor(pieceLength)
+                endQueue()
 
                 if setNewLinePending:
                     # Fill just one line without LF
@@ -2692,78 +1982,206 @@ class VT52_to_5250():
 
         return
 
+    # The counter cache is checked and updated in the same locked step the
+    # command is queued, so it follows the order of pendingCommands even
+    # with commands coming from several threads
     def transmitCommand(self, command, destination, data):
-        return self.transmitCommandOrPoll(command, destination, data, 0)
-
+        assert destination == self.destinationAddr
+        toTx = self.encodeCommand(command, destination, data, 0)
+        with self.pendingCommandsLock:
+            if not self.isRedundantCommand(command, data):
+                self.pendingCommands.append(toTx)
+        return
+
+    # Transmit several (command, data) pairs followed by EOQ as one command
+    # sequence, handing them to the queue in a single step
+    def transmitSequence(self, commands):
+        destination = self.destinationAddr
+        encoded = [(command, data,
+                    self.encodeCommand(command, destination, data, 0))
+                   for command, data in commands]
+        eoq = self.encodeCommand(EOQ, destination, b'', 0)
+        with self.pendingCommandsLock:
+            sequence = self.pendingCommands
+            sequence.extend(toTx for command, data, toTx in encoded
+                            if not self.isRedundantCommand(command, data))
+            if not sequence:
+                # Every command was redundant, there is nothing to end
+                return
+            sequence.append(eoq)
+            self.pendingCommands = []
+            outputCommandQueue[destination].append(sequence)
+        return
+
+    # Encode (command, data) pairs followed by EOQ, to be sent later with
+    # queueSequence
+    def encodeSequence(self, commands):
+        destination = self.destinationAddr
+        return tuple(self.encodeCommand(command, destination, data, 0)
+                     for command, data in commands + ((EOQ, b''),))
+
+    # Queue already encoded commands, ending with EOQ, as the end of the
+    # command sequence. They are not checked against the counter cache and
+    # may change the counters, so the cache is forgotten with them
+    def queueSequence(self, encoded):
+        with self.pendingCommandsLock:
+            self.pendingCommands.extend(encoded)
+            sequence = self.pendingCommands
+            self.pendingCommands = []
+            self.forgetCounters()
+            outputCommandQueue[self.destinationAddr].append(sequence)
+        return
+
+    # Loading a counter with the position it already holds does nothing,
+    # so remember the last loaded positions and skip redundant loads.
+    # Called with pendingCommandsLock held
+    def isRedundantCommand(self, command, data):
+        if command == LOAD_ADDRESS_COUNTER:
+            if data == self.lastAddressCounter:
+                return True
+            self.lastAddressCounter = data
+        elif command == LOAD_CURSOR_REGISTER:
+            if data == self.lastCursorRegister:
+                return True
+            self.lastCursorRegister = data
+        elif command not in COUNTER_PRESERVING_COMMANDS:
+            # Data writes, clears, moves and resets change the counters on
+            # the terminal side
+            self.forgetCounters()
+        return False
+
+    # Next counter loads will be sent unconditionally. Called with
+    # pendingCommandsLock held, unless no other thread is queueing commands
+    def forgetCounters(self):
+        self.lastAddressCounter = None
+        self.lastCursorRegister = None
+        return
+
+    # Drop all the commands not sent yet. The counter loads among them never
+    # reach the terminal, so the last loaded positions are forgotten too
+    def discardCommands(self):
+        with self.pendingCommandsLock:
+            self.pendingCommands = []
+            outputCommandQueue[self.destinationAddr].clear()
+            self.forgetCounters()
+        return
+
+    # Encodes a poll or ack and queues it to send over the serial interface,
+    # ahead of the command sequences
     def transmitPoll(self, command, destination, data):
-        return self.transmitCommandOrPoll(command, destination, data, 1)
-
-    # Encodes a command + data or poll to send over the serial interface
-    def transmitCommandOrPoll(self, command, destination, data, isPoll):
         # @todo The destination parameter appears to be redundant and
         # could probably be removed.
         assert destination == self.destinationAddr
 
-        firstByte = (command & 0x3F) + 0x40
-        secondByte = ((command & 0xC0) >> 6) + (destination << 2) + 0x40
+        toTx = self.encodeCommand(command, destination, data, 1)
+        outputQueue[destination].append(toTx)
+        return
 
-        if isPoll and self.getLineParity():
-            secondByte = secondByte + 0x01
-
-        toTx = bytearray()
-        toTx.append(firstByte)
-        toTx.append(secondByte)
-        index = 1
-        for i in data:
-            thirdByte = (i & 0x3F) + 0x40
-            if thirdByte == 0x7F:
-                # weird bug with DEL chars
-                thirdByte = 0x3F
-            if (index < len(data)):
-                fourthByte = ((i & 0xC0) >> 6) + (destination << 2) + 0x40
-            else:
-                fourthByte = ((i & 0xC0) >> 6) + (7 << 2) + 0x40
-            index = index+1
-            toTx.append(thirdByte)
-            toTx.append(fourthByte)
+    # Encodes a command + data or poll as a line for the serial interface
+    def encodeCommand(self, command, destination, data, isPoll):
+        header = COMMAND_HEADERS[destination][command]
 
-        toTx.append(0x0A)
-        global outputQueue
-        if isPoll:
-            outputQueue[self.destinationAddr].put(toTx.decode())
-        else:
-            # debugLog.write("PUSHING COMMAND: " + toTx.decode() + "\n")
-            outputCommandQueue[self.destinationAddr].put(toTx.decode())
-        # debugLog.write(toTx.decode())
-        # debugLog.write("\n")
-        return
+        if isPoll and self.getLineParity():
+            header = bytes((header[0], header[1] + 0x01))
+
+        length = len(data)
+        if not length:
+            return header + b'\n'
+
+        # Two bytes per data byte, low and high bits interleaved, built with
+        # one table translation each. The last high byte flags the end of
+        # the data with address 7
+        data = bytes(data)
+        toTx = bytearray(2 * length + 3)
+        toTx[0:2] = header
+        toTx[2:-1:2] = data.translate(DATA_LOW_BITS)
+        toTx[3:-1:2] = data.translate(DATA_HIGH_BITS[destination])
+        toTx[-2] = DATA_HIGH_BITS[7][data[-1]]
+        toTx[-1] = 0x0A
+        return bytes(toTx)
 
     # Mark end of a related command sequence
     # At this point the serial code will wait for a response before sending
     # more commands to this terminal
     # to avoid buffer overruns
+    # The whole sequence goes to the queue as a single list of commands
+    # Sequences are queued as soon as they end, not held back to be merged
+    # by size or time: the busy bit is checked between sequences, a merged
+    # one would start the next command queue while the terminal may still
+    # be running the previous one
+    # The EOQ is added in the same locked step the pending commands are
+    # checked and taken, so another thread can't leave it alone in a sequence
     def endOfCommandSequence(self):
-        outputCommandQueue[self.destinationAddr].put("")
+        eoq = self.encodeCommand(EOQ, self.destinationAddr, b'', 0)
+        with self.pendingCommandsLock:
+            commands = self.pendingCommands
+            if not commands:
+                # Nothing sent since the last one, e.g. the counter loads of
+                # a cursor sync were all redundant
+                return
+            commands.append(eoq)
+            self.pendingCommands = []
+            outputCommandQueue[self.destinationAddr].append(commands)
+        return
+
+    # Send a status byte to the terminal. It leaves the counters alone, so
+    # there is nothing to check before queueing its frame
+    def transmitStatusByte(self, statusByte):
+        frame = self.statusByteFrames[statusByte]
+        with self.pendingCommandsLock:
+            self.pendingCommands.append(frame)
+        return
+
+    # Load the cursor register and the address counter with one position
+    def loadCursorAndAddress(self, position):
+        transmit = self.transmitCommand
+        addr = self.destinationAddr
+        transmit(LOAD_CURSOR_REGISTER, addr, position)
+        transmit(LOAD_ADDRESS_COUNTER, addr, position)
+        return
+
+    # Send the current cursor position to the terminal and end the sequence
+    def syncCursor(self):
+        self.loadCursorAndAddress(self.getEncodedCursorPosition())
+        self.EOQ()
+        return
+
+    # Drop the commands not sent yet and start over from a blank screen,
+    # with the cursor where the shell left it. Used when a command can't be
+    # delivered, as the commands queued after it rely on the counters it set
+    def resyncScreen(self):
+        self.discardCommands()
+        cursor = (self.newlinePending, self.cursorInPreviousLine,
+                  self.cursorX, self.cursorY)
+        self.ESC_E()
+        (self.newlinePending, self.cursorInPreviousLine,
+         self.cursorX, self.cursorY) = cursor
+        self.syncCursor()
         return
 
     # Get cursor position in 5250 format  (x*80 + y)
     def getEncodedPosition(self, x, y):
-        return (x*80 + y).to_bytes(2, byteorder='big')
+        position = x*80 + y
+        if 0 <= position < 1920:
+            return ENCODED_POSITIONS[position]
+        # Off screen, e.g. the line after the last one
+        return position.to_bytes(2, byteorder='big')
 
     # Increment cursor position without changing line
     def incrementCursorKeepLine(self, inc):
         self.newlinePending = False
         self.cursorInPreviousLine = False
-        self.cursorY = min([max([0, self.cursorY + inc]), 79])
+        cursorY = self.cursorY + inc
+        self.cursorY = 0 if cursorY < 0 else 79 if cursorY > 79 else cursorY
         return
 
     # Increment cursor position changing line if needed
     def incrementCursor(self, inc):
         self.newlinePending = False
         self.cursorInPreviousLine = False
-        self.cursorX = min(
-            [max([0, (self.cursorX + ((self.cursorY + inc) // 80))]), 23])
-        self.cursorY = min([max([0, ((self.cursorY + inc) % 80)]), 79])
+        lines, self.cursorY = divmod(self.cursorY + inc, 80)
+        cursorX = self.cursorX + lines
+        self.cursorX = 0 if cursorX < 0 else 23 if cursorX > 23 else cursorX
         return
 
     # Get number of characters left to write before we reach the end of screen
@@ -2807,13 +2225,14 @@ class VT52_to_5250():
         self.cursorY = ((self.cursorY + 8) // 8) * 8
         if (self.cursorY > 79):
             self.cursorY = self.cursorY % 80
-            self.cursorX = min([23, (self.cursorX + 1)])
+            if self.cursorX < 23:
+                self.cursorX += 1
 
     def getLowerRightCornerEncodedPosition(self):
-        return self.getEncodedPosition(23, 79)
+        return LOWER_RIGHT_CORNER
 
     def getUpperLeftCornerEncodedPosition(self):
-        return self.getEncodedPosition(0, 0)
+        return UPPER_LEFT_CORNER
 
     def getBeginningCurrentLineEncodedPosition(self):
         return self.getEncodedPosition(self.cursorX, 0)
@@ -2822,7 +2241,7 @@ class VT52_to_5250():
         return self.getEncodedPosition(self.cursorX, 79)
 
     def getLowerRightPenultimateEncodedPosition(self):
-        return self.getEncodedPosition(22, 79)
+        return PENULTIMATE_LINE_END
 
     # Get cursor position in 5250 format
     def getEncodedCursorPosition(self):
@@ -2832,11 +2251,24 @@ class VT52_to_5250():
         if self.cursorY < 0:
             # WTF? I told you to go away!
             self.cursorY = 0
-        return self.getEncodedPosition(self.cursorX, self.cursorY)
+        position = self.cursorX*80 + self.cursorY
+        if position < 1920:
+            return ENCODED_POSITIONS[position]
+        return position.to_bytes(2, byteorder='big')
 
     # Get first char of next line position
     def getBeginningNextLineEncodedPosition(self):
-        return self.getEncodedPosition(min([self.cursorX + 1, 23]), 0)
+        return self.getEncodedPosition(
+            self.cursorX + 1 if self.cursorX < 23 else 23, 0)
+
+    # After writing up to the end of a line the VT52 cursor is really still
+    # in that line, at its last column. Put it there before moving it
+    def resolvePreviousLine(self):
+        if self.cursorInPreviousLine:
+            if self.cursorX > 0 and not self.newlinePending:
+                self.cursorX = self.cursorX - 1
+            self.cursorY = 79
+        return
 
     # Position cursor in origin
     def zeroCursorPosition(self):
@@ -2850,169 +2282,129 @@ class VT52_to_5250():
     # ASCII and sending to the shell
     def processScanCode(self, scancode):
         global interceptors
+        if not 0 <= scancode < SCANCODE_TABLE_SIZE:
+            # Not a scancode, can only come from the CLI
+            self.isExtraEnabled = 0
+            return
+
         # Look for break keys
-        if scancode in self.scancodeDictionary['EXTRA']:
-            # Next char is extra
-            self.isExtraEnabled = 1
+        handler = self.modifierHandlers.get(scancode)
+        if handler is not None:
+            self.isExtraEnabled = 0
+            handler()
             return
 
-        if scancode in self.scancodeDictionary['SHIFT_PRESS']:
-            # press shift
-            self.isShiftEnabled = 1
-            # debugLog.write("SPECIAL SHIFT ENABLED\n")
-        elif scancode in self.scancodeDictionary['SHIFT_RELEASE']:
-            # release shift
-            self.isShiftEnabled = 0
-            # debugLog.write("SPECIAL SHIFT DISABLED\n")
-        elif scancode in self.scancodeDictionary['CTRL_PRESS']:
-
-            if self.isControlEnabled and \
-                    len(self.scancodeDictionary['CTRL_RELEASE']) == 0:
-                # needed if you use a non-break key for releasing CONTROL
+        # regular key
+        # Transmit regular, shifted, control, or alt variant
+        # debugLog.write(f"RECEIVED SCANCODE:{scancode:#x}"
+        #                f" FROM TERMINAL: {self.destinationAddr}\n")
+        if self.scancodeTable[scancode] is None:
+            # error
+            # debugLog.write("UNKNOWN SCANCODE: " + str(scancode) +
+            #                " FOR TERMINAL: " +
+            #                str(self.destinationAddr) + "\n")
+            self.isExtraEnabled = 0
+            return
+
+        # Pick the modifier row, precedence is already resolved in
+        # MODIFIER_ROWS
+        modifier = MODIFIER_ROWS[
+            (self.isShiftEnabled ^ self.isCapsLockEnabled) |
+            (self.isControlEnabled << 1) |
+            (self.isAltEnabled << 2) |
+            (self.isExtraEnabled << 3)]
+
+        if modifier == KEY_CTRL:
+            # CTRL+key
+            if self.ctrlReleaseEmpty:
+                # needed if you use a non-break key for CONTROL
                 self.isControlEnabled = 0
-            else:
-                # pressed ctrl
-                self.isControlEnabled = 1
-                # debugLog.write("SPECIAL CONTROL ENABLED\n")
-        elif scancode in self.scancodeDictionary['CTRL_RELEASE']:
-            # release ctrl
-            self.isControlEnabled = 0
-            # debugLog.write("SPECIAL CONTROL DISABLED\n")
-        elif scancode in self.scancodeDictionary['ALT_PRESS']:
-            if self.isAltEnabled and \
-                    len(self.scancodeDictionary['ALT_RELEASE']) == 0:
-                # needed if you use a non-break key for releasing CONTROL
+
+        elif modifier == KEY_ALT:
+            mapping = self.scancodeTable[scancode]
+            # Check for enable/disble solenid
+            if mapping[0] == 's':
+                self.toggleEnabledClicker()
+                self.isExtraEnabled = 0
+                return
+            # ALT + key, ESC sequences keep ALT pressed
+            if mapping[2] != ESC and self.altReleaseEmpty:
+                # needed if you use a non-break key for ALT
                 self.isAltEnabled = 0
-            else:
-                # press alt
-                self.isAltEnabled = 1
-                # debugLog.write("SPECIAL ALT ENABLED\n")
-        elif scancode in self.scancodeDictionary['ALT_RELEASE']:
-            # release alt
-            self.isAltEnabled = 0
-            # debugLog.write("SPECIAL ALT DISABLED\n")
-        elif scancode in self.scancodeDictionary['CAPS_LOCK']:
-            # CAPS LOCK
-            self.isCapsLockEnabled = not self.isCapsLockEnabled
-            # Turn on light
-            if self.isCapsLockEnabled:
-                if not self.advancedFeatures:
-                    self.indicatorsByte = self.indicatorsByte | 0x20
-                    self.transmitCommand(WRITE_DATA_LOAD_CURSOR_INDICATORS,
-                                         self.destinationAddr,
-                                         [self.indicatorsByte])
-                else:
-                    self.transmitCommand(WRITE_CONTROL_DATA_INDICATORS,
-                                         self.destinationAddr,
-                                         [0x80])
 
-            else:
-                if not self.advancedFeatures:
-                    self.indicatorsByte = self.indicatorsByte & 0xDF
-                    self.transmitCommand(WRITE_DATA_LOAD_CURSOR_INDICATORS,
-                                         self.destinationAddr,
-                                         [self.indicatorsByte])
-                else:
-                    self.transmitCommand(WRITE_CONTROL_DATA_INDICATORS,
-                                         self.destinationAddr,
-                                         [0x00])
+        sequence = KEY_SEQUENCES[
+            self.keySequenceOffset + ((modifier << 8) | scancode)]
+        if sequence:
+            interceptors[self.destinationAddr].stdin_read(sequence)
 
-            self.EOQ()
+        self.isExtraEnabled = 0
+        return
+
+    # Modifier key handlers, dispatched from processScanCode
+
+    def pressExtra(self):
+        # Next char is extra
+        self.isExtraEnabled = 1
+
+    def pressShift(self):
+        self.isShiftEnabled = 1
+        # debugLog.write("SPECIAL SHIFT ENABLED\n")
 
+    def releaseShift(self):
+        self.isShiftEnabled = 0
+        # debugLog.write("SPECIAL SHIFT DISABLED\n")
+
+    def pressControl(self):
+        if self.isControlEnabled and self.ctrlReleaseEmpty:
+            # needed if you use a non-break key for releasing CONTROL
+            self.isControlEnabled = 0
         else:
-            # regular key
-            # Transmit regular, shifted, control, or alt variant
-            # debugLog.write("RECEIVED SCANCODE:" + hex(scancode) +
-            #                " FROM TERMINAL: " +
-            #                str(self.destinationAddr)  +   "\n")
-            if scancode not in self.scancodeDictionary:
-                # error
-                # debugLog.write("UNKNOWN SCANCODE: " + str(scancode) +
-                #                " FOR TERMINAL: " +
-                #                str(self.destinationAddr) + "\n")
-                self.isExtraEnabled = 0
-                return
+            self.isControlEnabled = 1
+            # debugLog.write("SPECIAL CONTROL ENABLED\n")
 
+    def releaseControl(self):
+        self.isControlEnabled = 0
+        # debugLog.write("SPECIAL CONTROL DISABLED\n")
+
+    def pressAlt(self):
+        if self.isAltEnabled and self.altReleaseEmpty:
+            # needed if you use a non-break key for releasing CONTROL
+            self.isAltEnabled = 0
+        else:
+            self.isAltEnabled = 1
+            # debugLog.write("SPECIAL ALT ENABLED\n")
+
+    def releaseAlt(self):
+        self.isAltEnabled = 0
+        # debugLog.write("SPECIAL ALT DISABLED\n")
+
+    def toggleCapsLock(self):
+        transmit = self.transmitCommand
+        addr = self.destinationAddr
+        capsLock = not self.isCapsLockEnabled
+        self.isCapsLockEnabled = capsLock
+        # Turn on light
+        if capsLock:
+            if not self.advancedFeatures:
+                indicators = self.indicatorsByte | 0x20
+                self.indicatorsByte = indicators
+                transmit(WRITE_DATA_LOAD_CURSOR_INDICATORS, addr,
+                         BYTE_PAYLOADS[indicators])
             else:
-                if \
-                        (self.isShiftEnabled and not self.isCapsLockEnabled) \
-                        or \
-                        (not self.isShiftEnabled and self.isCapsLockEnabled):
-                    # SHIFT+key
-
-                    if self.scancodeDictionary[scancode][1] == chr(0x1B):
-                        # Cursors
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][1])
-                        if len(self.scancodeDictionary[scancode]) > 4:
-                            interceptors[self.destinationAddr].stdin_read(
-                                self.scancodeDictionary[scancode][4])
-                    else:
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][1])
-
-                elif self.isControlEnabled:
-                    # CTRL+key
-                    if len(self.scancodeDictionary['CTRL_RELEASE']) == 0:
-                        # needed if you use a non-break key for CONTROL
-                        self.isControlEnabled = 0
-                    # Check if ESC + key
-                    if self.scancodeDictionary[scancode][3] == chr(0x1B):
-                        # Cursors
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][3])
-                        if len(self.scancodeDictionary[scancode]) > 4:
-                            interceptors[self.destinationAddr].stdin_read(
-                                self.scancodeDictionary[scancode][4])
-                    else:
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][3])
-
-                elif self.isAltEnabled:
-
-                    # Check for enable/disble solenid
-                    if self.scancodeDictionary[scancode][0] == 's':
-                        self.toggleEnabledClicker()
-
-                    # Check if ESC + key
-                    elif self.scancodeDictionary[scancode][2] == chr(0x1B):
-                        # Cursors
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][2])
-                        if len(self.scancodeDictionary[scancode]) > 4:
-                            interceptors[self.destinationAddr].stdin_read(
-                                self.scancodeDictionary[scancode][4])
-                    else:
-                        # ALT + key
-                        if len(self.scancodeDictionary['ALT_RELEASE']) == 0:
-                            # needed if you use a non-break key for ALT
-                            self.isAltEnabled = 0
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][2])
-
-                elif self.isExtraEnabled:
-                    self.isExtraEnabled = 0
-                    if len(self.scancodeDictionary[scancode]) > 5:
-                        interceptors[self.destinationAddr].stdin_read(
-                            chr(0x1B))
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][5])
+                transmit(WRITE_CONTROL_DATA_INDICATORS, addr,
+                         BYTE_PAYLOADS[0x80])
 
-                else:
-                    # Standard key
-                    if self.scancodeDictionary[scancode][0] == chr(0x1B):
-                        # Cursors
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][0])
-                        if len(self.scancodeDictionary[scancode]) > 4:
-                            interceptors[self.destinationAddr].stdin_read(
-                                self.scancodeDictionary[scancode][4])
-                    else:
-                        interceptors[self.destinationAddr].stdin_read(
-                            self.scancodeDictionary[scancode][0])
+        else:
+            if not self.advancedFeatures:
+                indicators = self.indicatorsByte & 0xDF
+                self.indicatorsByte = indicators
+                transmit(WRITE_DATA_LOAD_CURSOR_INDICATORS, addr,
+                         BYTE_PAYLOADS[indicators])
+            else:
+                transmit(WRITE_CONTROL_DATA_INDICATORS, addr,
+                         BYTE_PAYLOADS[0x00])
 
-        self.isExtraEnabled = 0
-        return
+        self.EOQ()
 
     # VT52 escape sequences implemented as 5250 commands and other 5250
     # management commands
@@ -3021,37 +2413,36 @@ class VT52_to_5250():
 
     def RESET(self):
         # Set transmission mode to zero fill
-        self.transmitCommand(RESET, self.destinationAddr, [])
+        self.transmitCommand(RESET, self.destinationAddr, b'')
         return
 
     def SET_MODE(self):
         # Set transmission mode to zero fill
-        self.transmitCommand(SET_MODE, self.destinationAddr, [0])
+        self.transmitCommand(SET_MODE, self.destinationAddr, BYTE_PAYLOADS[0])
         self.EOQ()
-        self.transmitCommand(WRITE_CONTROL_DATA, self.destinationAddr, [
-                             self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
     def resetException(self):
-        self.transmitCommand(WRITE_CONTROL_DATA, self.destinationAddr, [
-                             self.statusByte | 0x04])
+        with self.pendingCommandsLock:
+            self.forgetCounters()
+        self.transmitStatusByte(self.statusByte | 0x04)
         self.EOQ()
         return
 
     def POLL(self):
         # Poll station
-        self.transmitPoll(POLL, self.destinationAddr, [])
+        self.transmitPoll(POLL, self.destinationAddr, b'')
         return
 
     def ACK(self):
         # ACK station response
-        self.transmitPoll(ACK, self.destinationAddr, [])
+        self.transmitPoll(ACK, self.destinationAddr, b'')
         return
 
     def EOQ(self):
         # End of command queue
-        self.transmitCommand(EOQ, self.destinationAddr, [])
         self.endOfCommandSequence()
         return
 
@@ -3059,138 +2450,110 @@ class VT52_to_5250():
         # Backspace 	Delete character to left of cursor.
         self.incrementCursor(-1)
         # update cursor position
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
+        # One EBCDIC blank
         self.transmitCommand(WRITE_DATA_LOAD_CURSOR,
-                             self.destinationAddr, [1, 0x40])
+                             self.destinationAddr, b'\x01\x40')
         self.EOQ()
         return
 
     def BEL(self):
         # Bell, audible alert
         if self.clickerEnabled:
-            self.transmitCommand(WRITE_CONTROL_DATA, self.destinationAddr, [
-                                self.statusByte | 0x01])
+            self.transmitStatusByte(self.statusByte | 0x01)
             self.EOQ()
         return
 
     def ESC_J(self):
         # Clear to end of screen 	Clear screen from cursor onwards.
-        # Move address counter to cursor position
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        # Move reference counter to lower right corner
-        self.transmitCommand(LOAD_REFERENCE_COUNTER, self.destinationAddr,
-                             self.getLowerRightCornerEncodedPosition())
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
-        self.EOQ()
+        self.transmitSequence((
+            # Move address counter to cursor position
+            (LOAD_ADDRESS_COUNTER, self.getEncodedCursorPosition()),
+            # Move reference counter to lower right corner
+            (LOAD_REFERENCE_COUNTER, LOWER_RIGHT_CORNER),
+            # Send clear command
+            (CLEAR, b'')))
         return
 
     def ESC_K(self):
         # Clear to end of line 	Clear line from cursor onwards.
-        # Move address counter to cursor position
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        # Move reference counter to end of current line
-        self.transmitCommand(LOAD_REFERENCE_COUNTER, self.destinationAddr,
-                             self.getEndCurrentLineEncodedPosition())
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
-        self.EOQ()
+        self.transmitSequence((
+            # Move address counter to cursor position
+            (LOAD_ADDRESS_COUNTER, self.getEncodedCursorPosition()),
+            # Move reference counter to end of current line
+            (LOAD_REFERENCE_COUNTER, self.getEndCurrentLineEncodedPosition()),
+            # Send clear command
+            (CLEAR, b'')))
         return
 
     def ESC_E(self):
         # Clear screen 	Clear screen and place cursor at top left corner.
-        # Move address counter to upper left corner
-        self.transmitCommand(LOAD_ADDRESS_COUNTER, self.destinationAddr,
-                             self.getUpperLeftCornerEncodedPosition())
-        # Move reference counter to lower right corner
-        self.transmitCommand(LOAD_REFERENCE_COUNTER, self.destinationAddr,
-                             self.getLowerRightCornerEncodedPosition())
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
         # Move cursor to upper left corner
         self.zeroCursorPosition()
-        # update cursor position
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        sequence = self.clearScreenSequence
+        with self.pendingCommandsLock:
+            if self.lastAddressCounter == UPPER_LEFT_CORNER:
+                # Address counter already there
+                sequence = sequence[1:]
+            self.pendingCommands.extend(sequence)
+            sequence = self.pendingCommands
+            self.pendingCommands = []
+            # Both counters end in the upper left corner
+            self.lastAddressCounter = UPPER_LEFT_CORNER
+            self.lastCursorRegister = UPPER_LEFT_CORNER
+            outputCommandQueue[self.destinationAddr].append(sequence)
         return
 
     def ESC_l(self):
         # Clear line 	Clear current line.
-        # Move address counter to beginning of current line
-        self.transmitCommand(LOAD_ADDRESS_COUNTER, self.destinationAddr,
-                             self.getBeginningCurrentLineEncodedPosition())
-        # Move reference counter to end of current line
-        self.transmitCommand(LOAD_REFERENCE_COUNTER, self.destinationAddr,
-                             self.getEndCurrentLineEncodedPosition())
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
-        # Move cursor to beginiing lina
-        self.transmitCommand(LOAD_CURSOR_REGISTER, self.destinationAddr,
-                             self.getBeginningCurrentLineEncodedPosition())
-        self.EOQ()
+        beginningOfLine = self.getBeginningCurrentLineEncodedPosition()
+        self.transmitSequence((
+            # Move address counter to beginning of current line
+            (LOAD_ADDRESS_COUNTER, beginningOfLine),
+            # Move reference counter to end of current line
+            (LOAD_REFERENCE_COUNTER, self.getEndCurrentLineEncodedPosition()),
+            # Send clear command
+            (CLEAR, b''),
+            # Move cursor to beginiing lina
+            (LOAD_CURSOR_REGISTER, beginningOfLine)))
         return
 
     def ESC_o(self):
         # Clear to start of line 	Clear current line up to cursor.
-        # Move address counter to beginning of current line
-        self.transmitCommand(LOAD_ADDRESS_COUNTER, self.destinationAddr,
-                             self.getBeginningCurrentLineEncodedPosition())
-        # Move reference counter to cursor position
-        self.transmitCommand(LOAD_REFERENCE_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
-        self.EOQ()
+        self.transmitSequence((
+            # Move address counter to beginning of current line
+            (LOAD_ADDRESS_COUNTER,
+             self.getBeginningCurrentLineEncodedPosition()),
+            # Move reference counter to cursor position
+            (LOAD_REFERENCE_COUNTER, self.getEncodedCursorPosition()),
+            # Send clear command
+            (CLEAR, b'')))
         return
 
     def ESC_d(self):
         # Clear to start of screen 	Clear screen up to cursor.
-        # Move address counter to upper left corner
-        self.transmitCommand(LOAD_ADDRESS_COUNTER, self.destinationAddr,
-                             self.getUpperLeftCornerEncodedPosition())
-        # Move reference counter to cursor position
-        self.transmitCommand(LOAD_REFERENCE_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
-        self.EOQ()
+        self.transmitSequence((
+            # Move address counter to upper left corner
+            (LOAD_ADDRESS_COUNTER, UPPER_LEFT_CORNER),
+            # Move reference counter to cursor position
+            (LOAD_REFERENCE_COUNTER, self.getEncodedCursorPosition()),
+            # Send clear command
+            (CLEAR, b'')))
         return
 
     def ESC_B(self):
         # Cursor down 	Move cursor one line downwards.
         # increment cursor line
-        if self.cursorX > 0 and self.cursorInPreviousLine:
+        cursorX = self.cursorX
+        if cursorX > 0 and self.cursorInPreviousLine:
             self.cursorY = 79
 
-        elif self.cursorX < 23:
-            self.cursorX = self.cursorX + 1
+        elif cursorX < 23:
+            self.cursorX = cursorX + 1
 
         # update cursor position
         self.positionCursor(self.cursorX, self.cursorY)
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
 
         return
 
@@ -3199,198 +2562,135 @@ class VT52_to_5250():
         # zero cursor position
         self.zeroCursorPosition()
         # update cursor position
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
         return
 
     def ESC_D(self):
         # Cursor left 	Move cursor one column to the left.
-        if self.cursorX > 0 and self.cursorInPreviousLine:
-            if not self.newlinePending:
-                self.cursorX = self.cursorX - 1
-            self.cursorY = 79
-        elif self.cursorInPreviousLine:
-            self.cursorY = 79
+        self.resolvePreviousLine()
         # decremento cursor column
         self.incrementCursorKeepLine(-1)
         # update cursor position
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
         return
 
     def ESC_C(self):
         # Cursor right 	Move cursor one column to the right.
-
-        if self.cursorX > 0 and \
-                self.cursorInPreviousLine and \
-                not self.newlinePending:
-            self.cursorX = self.cursorX - 1
-
-        if self.cursorInPreviousLine:
-            self.cursorY = 79
-
+        self.resolvePreviousLine()
         # increment cursor column
         self.incrementCursorKeepLine(1)
         # update cursor position
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
         return
 
     def ESC_A(self):
         # Cursor up 	Move cursor one line upwards.
         # decrement cursor line
         if self.cursorX > 0:
-            if self.cursorInPreviousLine:
-                if not self.newlinePending:
-                    self.cursorX = self.cursorX - 1
-                self.cursorY = 79
+            self.resolvePreviousLine()
             self.cursorX = self.cursorX - 1
             # update cursor position
             self.positionCursor(self.cursorX, self.cursorY)
-            self.transmitCommand(LOAD_CURSOR_REGISTER,
-                                 self.destinationAddr,
-                                 self.getEncodedCursorPosition())
-            self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                                 self.destinationAddr,
-                                 self.getEncodedCursorPosition())
-            self.EOQ()
+            self.syncCursor()
         return
 
     def ESC_Y(self, x, y):
         # Set cursor position 	Position cursor.
         self.positionCursor(x, y)
         # update cursor position
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
         return
 
     def ESC_b(self):
         # Foreground color 	Set text colour.
         return
 
+    # Hide the cursor while the screen is being scrolled. Returns True if
+    # it was visible, so the caller knows to show it again
+    def hideCursor(self):
+        if self.statusByte & 0x80:
+            return False
+        self.statusByte = self.statusByte | 0x80
+        self.transmitStatusByte(self.statusByte)
+        self.EOQ()
+        return True
+
+    # Show the cursor again, the caller ends the command sequence
+    def showCursor(self):
+        self.statusByte = self.statusByte & 0x7F
+        self.transmitStatusByte(self.statusByte)
+        return
+
+    # Move a block of the screen buffer as one command sequence, with the
+    # counters loaded with the given encoded positions
+    def moveData(self, referenceCounter, addressCounter, cursorRegister):
+        self.transmitSequence((
+            (LOAD_REFERENCE_COUNTER, referenceCounter),
+            (LOAD_ADDRESS_COUNTER, addressCounter),
+            (LOAD_CURSOR_REGISTER, cursorRegister),
+            (MOVE_DATA, b'')))
+        return
+
+    # Scroll the whole screen one line up, clearing the last line, and load
+    # the cursor position again. The cursor is hidden meanwhile as the move
+    # takes it to the lower right corner
+    def scrollUp(self):
+        hidden = self.hideCursor()
+        # MOVE_DATA and CLEAR leave the counters where they finished, the
+        # cache is forgotten as they are queued
+        for sequence in self.scrollUpSequences:
+            self.queueSequence(sequence)
+        self.loadCursorAndAddress(self.getEncodedCursorPosition())
+        if hidden:
+            self.showCursor()
+        self.EOQ()
+        return
+
     def ESC_L(self):
         # Insert line 	Insert a line and move cursor to beginning
         # Move lines one position to the bottom
-        # Hide cursor.
-        hidden = False
-        if not self.statusByte & 0x80:
-            hidden = True
-            self.statusByte = self.statusByte | 0x80
-            self.transmitCommand(WRITE_CONTROL_DATA,
-                                 self.destinationAddr, [self.statusByte])
-            self.EOQ()
+        hidden = self.hideCursor()
 
-        # for x in range(23, self.cursorX, -1):
-        self.transmitCommand(LOAD_REFERENCE_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedPosition(23, 79))
-        # Move reference counter to beginning of current line
-        self.transmitCommand(LOAD_CURSOR_REGISTER, self.destinationAddr,
-                             self.getEncodedPosition(self.cursorX, 0))
-        # Move cursor counter to end of screen
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedPosition(22, 79))
-        # Move data
-        self.transmitCommand(MOVE_DATA, self.destinationAddr, [])
-        # update cursor position
-        self.EOQ()
+        # Lines from the current one to the penultimate go one line down
+        self.moveData(LOWER_RIGHT_CORNER, PENULTIMATE_LINE_END,
+                      self.getEncodedPosition(self.cursorX, 0))
 
         # Cursor to first column
         self.incrementCursorKeepLine(-80)
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
+        self.loadCursorAndAddress(self.getEncodedCursorPosition())
         # Clear current line
         self.ESC_K()
         # Restore cursor
         if hidden:
-            self.statusByte = self.statusByte & 0x7F
-            self.transmitCommand(WRITE_CONTROL_DATA,
-                                 self.destinationAddr, [self.statusByte])
+            self.showCursor()
         self.EOQ()
         return
 
     def ESC_M(self):
         # Delete line 	Remove line position cursor first column.
-        # Hide cursor.
-        hidden = False
-        if not self.statusByte & 0x80:
-            hidden = True
-            self.statusByte = self.statusByte | 0x80
-            self.transmitCommand(WRITE_CONTROL_DATA,
-                                 self.destinationAddr, [self.statusByte])
-            self.EOQ()
+        hidden = self.hideCursor()
 
         if self.cursorX != 23:
-            # copy previous line
-            self.transmitCommand(LOAD_REFERENCE_COUNTER,
-                                 self.destinationAddr,
-                                 self.getEncodedPosition(self.cursorX, 0))
-            # Move reference counter to beginning of current line
-            self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                                 self.destinationAddr,
-                                 self.getEncodedPosition(self.cursorX + 1, 0))
-            # Move cursor counter to end of screen
-            self.transmitCommand(LOAD_CURSOR_REGISTER,
-                                 self.destinationAddr,
-                                 self.getEncodedPosition(23, 79))
-            # Move data
-            self.transmitCommand(MOVE_DATA, self.destinationAddr, [])
-            # update cursor position
-            self.EOQ()
+            # Lines below the current one go one line up
+            self.moveData(self.getEncodedPosition(self.cursorX, 0),
+                          self.getEncodedPosition(self.cursorX + 1, 0),
+                          LOWER_RIGHT_CORNER)
 
         # Clear last line
-        # delete last line
-        # Move address counter to beginning of last line
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedPosition(23, 0))
-        # Move reference counter to end of last line
-        self.transmitCommand(LOAD_REFERENCE_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedPosition(23, 79))
-        # Send clear command
-        self.transmitCommand(CLEAR, self.destinationAddr, [])
-        self.EOQ()
+        self.transmitSequence((
+            # Move address counter to beginning of last line
+            (LOAD_ADDRESS_COUNTER, LAST_LINE_START),
+            # Move reference counter to end of last line
+            (LOAD_REFERENCE_COUNTER, LOWER_RIGHT_CORNER),
+            # Send clear command
+            (CLEAR, b'')))
 
         # Cursor to first column
         self.incrementCursorKeepLine(-80)
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
         # Restore cursor
         if hidden:
-            self.statusByte = self.statusByte & 0x7F
-            self.transmitCommand(WRITE_CONTROL_DATA,
-                                 self.destinationAddr, [self.statusByte])
+            self.showCursor()
             self.EOQ()
         return
 
@@ -3398,31 +2698,14 @@ class VT52_to_5250():
         # Line feed 	Line feed.
         if (self.cursorX == 23):
             # Last line
-            prevCursorY = self.cursorY
             # Need to delete line
             # delete first line
-            self.cursorX = 0
-            self.cursorY = 0
-            self.ESC_M()
-            self.cursorX = 23
-            self.cursorY = prevCursorY
-            self.transmitCommand(LOAD_CURSOR_REGISTER,
-                                 self.destinationAddr,
-                                 self.getEncodedCursorPosition())
-            self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                                 self.destinationAddr,
-                                 self.getEncodedCursorPosition())
-            self.EOQ()
+            self.positionCursor(23, self.cursorY)
+            self.scrollUp()
         else:
             # Otherwise
             self.incrementCursor(80)
-            self.transmitCommand(LOAD_CURSOR_REGISTER,
-                                 self.destinationAddr,
-                                 self.getEncodedCursorPosition())
-            self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                                 self.destinationAddr,
-                                 self.getEncodedCursorPosition())
-            self.EOQ()
+            self.syncCursor()
         return
 
     def ESC_k(self):
@@ -3444,32 +2727,23 @@ class VT52_to_5250():
         if self.newlinePending:
             # Already made
             return
-        if self.cursorInPreviousLine and self.cursorX > 0:
-            self.cursorX = self.cursorX - 1
+        self.resolvePreviousLine()
         self.incrementCursorKeepLine(-80)
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
 
         return
 
     def ESC_q(self):
         # Normal video 	Switch off inverse video text.
         self.statusByte = self.statusByte & 0xF7
-        self.transmitCommand(WRITE_CONTROL_DATA,
-                             self.destinationAddr, [self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
     def ESC_p(self):
         # Reverse video 	Switch on inverse video text.
         self.statusByte = self.statusByte | 0x08
-        self.transmitCommand(WRITE_CONTROL_DATA,
-                             self.destinationAddr, [self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
@@ -3487,7 +2761,7 @@ class VT52_to_5250():
 
     def FF(self):
         # Formfeed 	Form feed.
-        ESC_E()
+        self.ESC_E()
         return
 
     def HT(self):
@@ -3495,18 +2769,12 @@ class VT52_to_5250():
 
         # Calculate cursor Position
         self.jumpCursorNextTab()
-        self.transmitCommand(LOAD_CURSOR_REGISTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.transmitCommand(LOAD_ADDRESS_COUNTER,
-                             self.destinationAddr,
-                             self.getEncodedCursorPosition())
-        self.EOQ()
+        self.syncCursor()
         return
 
     def VT(self):
         # Tabulator 	Vertical tabulator
-        LF()
+        self.LF()
         return
 
     def ESC_w(self):
@@ -3522,32 +2790,28 @@ class VT52_to_5250():
     def ESC_e(self):
         # Cur_on 	Show cursor.
         self.statusByte = self.statusByte & 0x7F
-        self.transmitCommand(WRITE_CONTROL_DATA,
-                             self.destinationAddr, [self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
     def ESC_f(self):
         # Cur_off 	Hide cursor.
         self.statusByte = self.statusByte | 0x80
-        self.transmitCommand(WRITE_CONTROL_DATA,
-                             self.destinationAddr, [self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
     def Blink_on(self):
         # Switch on cursor blinking.
         self.statusByte = self.statusByte | 0x20
-        self.transmitCommand(WRITE_CONTROL_DATA,
-                             self.destinationAddr, [self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
     def Blink_off(self):
         # Switch off cursor blinking.
         self.statusByte = self.statusByte & 0xDF
-        self.transmitCommand(WRITE_CONTROL_DATA,
-                             self.destinationAddr, [self.statusByte])
+        self.transmitStatusByte(self.statusByte)
         self.EOQ()
         return
 
@@ -3561,65 +2825,136 @@ class VT52_to_5250():
         # TBD
         return
 
-
-#Launches Cmd attached to a file
-def spawnCmd(file, connection):
-        MyPrompt(file).cmdloop()
-        if connection is not None:
-            connection.shutdown(socket.SHUT_RDWR)
-            connection.close()
+    # Handlers of the VT52 escape codes without arguments, looked up by the
+    # character that follows ESC. ESC Y and ESC [ are parsed separately
+    ESC_HANDLERS = {
+        ord('A'): ESC_A,
+        ord('B'): ESC_B,
+        ord('C'): ESC_C,
+        ord('D'): ESC_D,
+        ord('E'): ESC_E,
+        ord('H'): ESC_H,
+        ord('I'): ESC_I,
+        ord('J'): ESC_J,
+        ord('K'): ESC_K,
+        ord('L'): ESC_L,
+        ord('M'): ESC_M,
+        ord('d'): ESC_d,
+        ord('e'): ESC_e,
+        ord('f'): ESC_f,
+        ord('j'): ESC_j,
+        ord('k'): ESC_k,
+        ord('l'): ESC_l,
+        ord('o'): ESC_o,
+        ord('p'): ESC_p,
+        ord('q'): ESC_q,
+    }
+
+    # Handlers of the control characters matched by PARSER_CONTROL_PATTERN,
+    # other than ESC and BEL
+    CONTROL_HANDLERS = {
+        0x08: BS,  # Backspace
+        0x09: HT,  # Horizontal tabulator
+        0x0A: LF,  # Line feed
+        0x0B: VT,  # Vertical tabulator
+        0x0C: FF,  # Form feed
+        0x0D: CR,  # Carriage return
+    }
+
+
+# Minimal file object so a Cmd can write to an asyncio stream. Commands run
+# in executor threads so writes are handed over to the event loop
+class StreamWriterFile():
+    def __init__(self, writer, loop):
+        self.writer = writer
+        self.loop = loop
+
+    def write(self, text):
+        self.loop.call_soon_threadsafe(self.writer.write, text.encode())
+
+    def flush(self):
+        return
+
+
+# Runs a Cmd session for one client connection, reading a line at a time
+async def cmdSession(reader, writer):
+    loop = asyncio.get_running_loop()
+    prompt = MyPrompt(StreamWriterFile(writer, loop))
+    prompt.stdout.write(str(prompt.intro) + "\n")
+    try:
+        while True:
+            prompt.stdout.write(prompt.prompt)
+            line = await reader.readline()
+            if not line:
+                # Client disconnected
+                break
+            line = prompt.precmd(line.decode(errors="replace").rstrip("\r\n"))
+            # Some commands sleep, keep them off the event loop
+            stop = await loop.run_in_executor(None, prompt.onecmd, line)
+            if prompt.postcmd(stop, line):
+                break
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
 
 
-# Listens for connections in TCP port 5251 ;-) and launches a Cmd for each
-def telnetServer():
-    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.setblocking(True)
-    s.bind(('', 5251))
-    s.listen(5)
+# Listens for connections in TCP port 5251 ;-)
+async def telnetServer():
+    server = await asyncio.start_server(cmdSession, '', 5251, backlog=5,
+                                        reuse_address=True)
     print(f"Making Telnet socket available at port 5251")
     print(f"Use e.g. `$ telnet localhost 5251` to connect.")
-
-    while True:
-        try:
-            connection, address = s.accept()
-            connection.setblocking(True)
-            _thread.start_new_thread(spawnCmd, (connection.makefile(mode="rw"),connection))
-
-        except BlockingIOError:
-            pass
-
+    return server
 
 
 # Listens at UDS socket for CMD connections
-def udsServer():
-    spath = "/tmp/5250_cmd_sock"
+async def udsServer():
+    spath = UDS_SOCKET_PATH
+    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
     try:
-        if stat.S_ISSOCK(os.stat(spath).st_mode):
-            os.remove(spath)
-        else:
+        s.bind(spath)
+    except OSError as e:
+        if e.errno != errno.EADDRINUSE:
+            raise
+        # Left behind by a previous run, only ever remove a socket
+        if not stat.S_ISSOCK(os.lstat(spath).st_mode):
             print(f"Path '{spath}' exists but is not a socket. Exiting")
             sys.exit(1)
-    except FileNotFoundError:
-        pass
+        os.unlink(spath)
+        s.bind(spath)
 
-    s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-    s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.bind(spath)
-    s.listen(1)
+    server = await asyncio.start_unix_server(cmdSession, sock=s, backlog=1)
     print(f"Making UDS socket available at {spath}.")
     print(f"Use e.g. `$ socat stdio UNIX:{spath}` to connect.")
+    return server
 
-    while True:
-        cs, ca = s.accept()
-        _thread.start_new_thread(spawnCmd, (cs.makefile(mode="rw"),cs))
+
+# Serves all the CMD connections from a single thread
+async def cmdServers(telnet, uds):
+    servers = []
+    if uds:
+        servers.append(await udsServer())
+    if telnet:
+        servers.append(await telnetServer())
+    await asyncio.gather(*(server.serve_forever() for server in servers))
 
 
 def parseTermDef(arg):
     """Parse and return a single terminal definition from the command line."""
     termdef = arg.split(":")
 
-    termAddress = int(termdef[0])
+    # Checked here so a bad definition is reported by argparse before any
+    # terminal is started
+    try:
+        termAddress = int(termdef[0])
+    except ValueError:
+        termAddress = -1
+    if not 0 <= termAddress <= 6:
+        raise argparse.ArgumentTypeError(
+            f'"{termdef[0]}" is not a valid station address: must be a '
+            f'number from 0 to 6')
     termDictionary = DEFAULT_SCANCODE_DICTIONARY
     pollDelayUs = DEFAULT_SLOW_POLLING
     codepage = DEFAULT_CODEPAGE
@@ -3627,6 +2962,10 @@ def parseTermDef(arg):
 
     if len(termdef) > 1 and termdef[1]!="":
         termDictionary = termdef[1]
+        if termDictionary not in scancodeDictionaries:
+            raise argparse.ArgumentTypeError(
+                f'"{termDictionary}" is not a known scancode dictionary: '
+                f'must be one of {", ".join(scancodeDictionaries)}')
 
     if len(termdef) > 2 and termdef[2]!="":
         value = termdef[2]
@@ -3663,6 +3002,11 @@ def parseTermDef(arg):
 
     if len(termdef) > 3 and termdef[3]!="":
         codepage = termdef[3]
+        try:
+            codecs.lookup(codepage)
+        except LookupError:
+            raise argparse.ArgumentTypeError(
+                f'"{codepage}" is not a known EBCDIC codepage')
 
     if len(termdef) > 4 and termdef[4]!="":
         advancedFeatures = bool(int(termdef[4]))
@@ -3730,6 +3074,20 @@ def parseArgs():
     return args
 
 
+def flushLogs():
+    """Write out whatever is still buffered in the log files"""
+    for log in (debugLog, writeLog, readLog):
+        if log is not None:
+            log.flush()
+
+
+def logFlusher(_passarg):
+    """Flush the logs periodically so they can be followed while running"""
+    while True:
+        time.sleep(LOG_FLUSH_INTERVAL)
+        flushLogs()
+
+
 # Main method
 if __name__ == '__main__':
 
@@ -3781,9 +3139,14 @@ if __name__ == '__main__':
         # Initializing terminal "termAddress"
 
         # Communication queues for the terminal
-        inputQueue[termAddress] = queue.Queue()
-        outputQueue[termAddress] = queue.Queue()
-        outputCommandQueue[termAddress] = queue.Queue()
+        # Poll/ack frames and their responses only go through the serial
+        # thread so they don't need the locking of queue.Queue
+        inputQueue[termAddress] = collections.deque()
+        outputQueue[termAddress] = collections.deque()
+        # Command sequences come from several threads and are only taken by
+        # the serial thread. deque append and popleft are atomic, so no lock
+        # is needed either
+        outputCommandQueue[termAddress] = collections.deque()
         # Terminal conversion object
         term[termAddress] = VT52_to_5250(
             termAddress, termDictionary, pollDelayUs, codepage, advancedFeatures, clickerEnabled)
@@ -3797,15 +3160,20 @@ if __name__ == '__main__':
     readLog = None
     debugLog = None
 
+    # Logs are block buffered so that logging in the hot paths doesn't cost
+    # a write syscall per line, they are flushed periodically and on exit
     if args.daemon:
-        debugLog = open("/tmp/debug.log", "w", buffering=1)
+        debugLog = open("/tmp/debug.log", "w", buffering=LOG_BUFFER_SIZE)
     else:
-       debugLog = open("debug.log", "w", buffering=1)
+       debugLog = open("debug.log", "w", buffering=LOG_BUFFER_SIZE)
        if debugIO:
-           writeLog = open("write.log", "wb", buffering=0)
-           readLog = open("read.log", "wb", buffering=0)
+           writeLog = open("write.log", "wb", buffering=LOG_BUFFER_SIZE)
+           readLog = open("read.log", "wb", buffering=LOG_BUFFER_SIZE)
+
 
 
+    atexit.register(flushLogs)
+    _thread.start_new_thread(logFlusher, (None,))
 
     debugLog.write("COMMAND LINE: " + ' '.join(sys.argv) + "\n")
     # the5250log = open("5250.log","w", buffering=1)
@@ -3818,13 +3186,14 @@ if __name__ == '__main__':
 
     if args.udsSocket:
         print("Enabling Unix Domain Socket\n")
-        #Launch thread to accept UDS CMD connections
-        _thread.start_new_thread(udsServer, ())
 
     if args.telnetSocket:
         print("Enabling Telnet Service at port 5251\n")
-        #Launch thread to accept telnet CMD connections
-        _thread.start_new_thread(telnetServer, ())
+
+    if args.udsSocket or args.telnetSocket:
+        #Launch thread to accept UDS and telnet CMD connections
+        _thread.start_new_thread(
+            asyncio.run, (cmdServers(args.telnetSocket, args.udsSocket),))
 
     #Launch CMD for the main shell
     if args.daemon:
@@ -3836,4 +3205,9 @@ if __name__ == '__main__':
             pass
     else:
         MyPrompt(None).cmdloop()
-        os.remove(spath)
+
+    if args.udsSocket:
+        try:
+            os.unlink(UDS_SOCKET_PATH)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,967 @@
+# Copyright 2020 Inmbolmie <inmbolmie@gmail.com>
+#
+# Permission is hereby granted, free of charge, to any person
+# obtaining a copy of this software and associated documentation files
+# (the "Software"), to deal in the Software without restriction,
+# including without limitation the rights to use, copy, modify, merge,
+# publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so,
+# subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be
+# included in all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND,
+# EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF
+# MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND
+# NONINFRINGEMENT. IN NO EVENT SHALL THE AUTHORS OR COPYRIGHT HOLDERS
+# BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN
+# ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN
+# CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
+# SOFTWARE.
+
+# Keyboard scancode mappings for the 5250_terminal.py script. They live in
+# their own module so that Python caches them compiled instead of parsing
+# all the literals on every start. See the README for how to add or change
+# a mapping.
+
+# Control characters used in the scancode lookup tables
+ESC = '\x1b'
+BS = '\x08'
+CR = '\r'
+TAB = '\t'
+DEL = '\x7f'
+
+# Scancode lookup tables
+# Format is the scancode as a key and a 4 or 5 sized array:
+# SCANCODE: [POS0, POS1, POS2, POS3, POS4]
+# Position 0: Normal key
+# Position 1: Shift + key
+# Position 2: Alt + key
+# Position 3: Ctrl + key
+# Position 4 (optional): Extra char to send when the first char resolves to
+#                        ESC (0x1B)
+# Position 5 (optional): When the EXTRA scancode is received before the given
+#                        scancode, send 0x1B plus this char
+
+scancodeDictionaries = {
+
+    '5250_ES': {
+
+        # SPECIAL KEYS MAPPINGS
+        'CTRL_PRESS': [0x54],
+        'CTRL_RELEASE': [0xD4],
+        'ALT_PRESS': [0x68],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x57, 0x56],
+        'SHIFT_RELEASE': [0xD7, 0xD6],
+        'CAPS_LOCK': [0x7E],
+        'EXTRA': [],
+
+        # FUNCTION BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x7C: [ESC, ESC, '', ''],  # F1 as ESC
+        0x6F: [ESC, ESC, '', ''],  # F2 as ESC
+        # ROW 2
+        0x6C: ['', '', '', ''],  # F3
+        0x6D: ['', '', '', ''],  # F4
+        # ROW 3
+        0x6E: ['', '', '', ''],  # F5
+        0x7D: ['', '', '', ''],  # F6
+        # ROW 4
+        0x71: ['', '', '', ''],  # F7
+        0x70: ['', '', '', ''],  # F8
+        # ROW 5
+        0x72: ['', '', '', ''],  # F9
+        0x73: ['', '', '', ''],  # F10
+
+        # MAIN ALPHA AND NUMPAD BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x3E: ['º', 'ª', '\\', ''],
+        0x31: ['1', '!', '|', ''],
+        0x32: ['2', '"', '@', ''],
+        0x33: ['3', '·', '#', ''],
+        0x34: ['4', '$', '~', ''],
+        0x35: ['5', '%', '½', ''],
+        0x36: ['6', '&', '', ''],
+        0x37: ['7', '/', '', ''],
+        0x38: ['8', '(', '', ''],
+        0x39: ['9', ')', '', ''],
+        0x3A: ['0', '=', '', ''],
+        0x3B: ['\'', '?', '', chr(0x1C)],
+        0x3C: ['¡', '¿', '', ''],
+        0x3D: [BS, BS, '', ''],  # BS
+        0x4B: ['', '', '', ''],
+        0x4C: ['', '', '', ''],  # DUP
+        # ROW 2
+        0x20: [TAB, TAB, '', ''],  # TAB
+        0x21: ['q', 'Q', '', chr(0x11)],
+        0x22: ['w', 'W', '', chr(0x17)],
+        0x23: ['e', 'E', '', chr(0x05)],
+        0x24: ['r', 'R', '', chr(0x12)],
+        0x25: ['t', 'T', '', chr(0x14)],
+        0x26: ['y', 'Y', '', chr(0x19)],
+        0x27: ['u', 'U', '', chr(0x15)],
+        0x28: ['i', 'I', '', TAB],
+        0x29: ['o', 'O', '', chr(0x0F)],
+        0x2A: ['p', 'P', '', chr(0x10)],
+        0x2B: ['`', '^', '[', ESC],
+        0x2C: ['+', '*', ']', chr(0x1D)],
+        0x2D: [CR, CR, '', ''],  # ENTER
+        0x47: ['7', '7', '', ''],
+        0x48: ['8', '8', ESC, ESC, 'A'],  # NUMPAD 8 and UP ARROW
+        0x49: ['9', '9', '', ''],
+        0x4E: ['', '', '', ''],  # CAMPO-
+        # ROW 3
+        # 0x54: ['', '', ''], #SHIFT
+        0x11: ['a', 'A', '', chr(0x01)],
+        0x12: ['s', 'S', '', chr(0x13)],
+        0x13: ['d', 'D', '', chr(0x04)],
+        0x14: ['f', 'F', '', chr(0x06)],
+        0x15: ['g', 'G', '', chr(0x07)],
+        0x16: ['h', 'H', '', BS],
+        0x17: ['j', 'J', '', chr(0x0A)],
+        0x18: ['k', 'K', '', chr(0x0B)],
+        0x19: ['l', 'L', '', chr(0x0C)],
+        0x1A: ['ñ', 'Ñ', '', ''],
+        0x1B: ['´', '¨', '{', ESC],
+        0x1C: ['ç', 'Ç', '}', chr(0x1D)],
+        0x44: ['4', '4', ESC, ESC, 'D'],  # NUMPAD 4 and LEFT ARROW
+        0x45: ['5', '5', '', ''],
+        # NUMPAD 6 and RIGHT ARROW
+        0x46: ['6', '6', ESC, ESC, 'C'],
+        0x4D: [CR, '', '', ''],  # ENTER
+        # ROW 4
+        # 0x57: ['', '', ''], #CTRL
+        0x0E: ['<', '>', '|', ''],
+        0x01: ['z', 'Z', '', chr(0x1A)],
+        0x02: ['x', 'X', '', chr(0x18)],
+        0x03: ['c', 'C', '', chr(0x03)],
+        0x04: ['v', 'V', '', chr(0x16)],
+        0x05: ['b', 'B', '', chr(0x02)],
+        0x06: ['n', 'N', '', chr(0x0E)],
+        0x07: ['m', 'M', '', CR],
+        0x08: [',', ';', '', ''],
+        0x09: ['.', ':', '', ''],
+        0x0A: ['-', '_', '', chr(0x1F)],
+        # 0x56: ['', '', ''], #ALT
+        0x0C: ['', '', '', ''],
+        0x41: ['1', '1', '', ''],
+        0x42: ['2', '2', ESC, ESC, 'B'],  # NUMPAD 2 and DOWN ARROW
+        0x43: ['3', '3', '', ''],
+        0x68: ['', '', '', ''],
+        0x40: ['0', '0', '', ''],
+        0x4A: [',', '', '', ''],
+        # ROW 5
+        0x0F: [' ', ' ', '', ''],  # SPACE BAR
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+            '[': 0x4A,
+            ']': 0x5A,
+            '^': 0x95,
+            '#': 0xBC
+        },
+    },
+
+    '5250_US': {
+
+        # SPECIAL KEYS MAPPINGS
+        'CTRL_PRESS': [0x54],
+        'CTRL_RELEASE': [0xD4],
+        'ALT_PRESS': [0x68],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x57, 0x56],
+        'SHIFT_RELEASE': [0xD7, 0xD6],
+        'CAPS_LOCK': [0x7E],
+        'EXTRA': [],
+
+        # FUNCTION BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x7C: [ESC, ESC, '', ''],  # F1 as ESC
+        0x6F: [ESC, ESC, '', ''],  # F2 as ESC
+        # ROW 2
+        # 0x6C: ['', '', '', ''], #F3
+        # 0x6D: ['', '', '', ''], #F4
+        # ROW 3
+        # 0x6E: ['', '', '', ''], #F5
+        # 0x7D: ['', '', '', ''], #F6
+        # ROW 4
+        # 0x71: ['', '', '', ''], #F7
+        # 0x70: ['', '', '', ''], #F8
+        # ROW 5
+        # 0x72: ['', '', '', ''], #F9
+        # 0x73: ['', '', '', ''], #F10
+
+        # MAIN ALPHA AND NUMPAD BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x3E: ['`', '~', '`', ''],
+        0x31: ['1', '|', '', ''],
+        0x32: ['2', '@', '', ''],
+        0x33: ['3', '#', '', ''],
+        0x34: ['4', '$', '', ''],
+        0x35: ['5', '%', '', ''],
+        0x36: ['6', '^', '', ''],
+        0x37: ['7', '&', '', ''],
+        0x38: ['8', '*', '', ''],
+        0x39: ['9', '(', '', ''],
+        0x3A: ['0', ')', '', ''],
+        0x3B: ['-', '_', '', chr(0x1C)],
+        0x3C: ['=', '+', '', ''],
+        0x3D: [BS, BS, '', ''],  # BS
+        0x4B: ['', '', '', ''],
+        0x4C: ['', '', '', ''],  # DUP
+        # ROW 2
+        0x20: [TAB, TAB, '', ''],  # TAB
+        0x21: ['q', 'Q', '', chr(0x11)],
+        0x22: ['w', 'W', '', chr(0x17)],
+        0x23: ['e', 'E', '', chr(0x05)],
+        0x24: ['r', 'R', '', chr(0x12)],
+        0x25: ['t', 'T', '', chr(0x14)],
+        0x26: ['y', 'Y', '', chr(0x19)],
+        0x27: ['u', 'U', '', chr(0x15)],
+        0x28: ['i', 'I', '', TAB],
+        0x29: ['o', 'O', '', chr(0x0F)],
+        0x2A: ['p', 'P', '', chr(0x10)],
+        0x2B: ['¢', '!', '', ESC],
+        0x2C: ['\\', '|', '', chr(0x1D)],
+        0x2D: [CR, CR, '', ''],  # ENTER
+        0x47: ['7', '7', '', ''],
+        0x48: ['8', '8', ESC, ESC, 'A'],  # NUMPAD 8 and UP ARROW
+        0x49: ['9', '9', '', ''],
+        0x4E: ['', '', '', ''],  # CAMPO-
+        # ROW 3
+        # 0x54 ['', '', ''], #SHIFT
+        0x11: ['a', 'A', '', chr(0x01)],
+        0x12: ['s', 'S', '', chr(0x13)],
+        0x13: ['d', 'D', '', chr(0x04)],
+        0x14: ['f', 'F', '', chr(0x06)],
+        0x15: ['g', 'G', '', chr(0x07)],
+        0x16: ['h', 'H', '', BS],
+        0x17: ['j', 'J', '', chr(0x0A)],
+        0x18: ['k', 'K', '', chr(0x0B)],
+        0x19: ['l', 'L', '', chr(0x0C)],
+        0x1A: [';', ':', '', ''],
+        0x1B: ['\'', '""', '', ESC],
+        0x1C: ['{', '}', '', chr(0x1D)],
+        0x44: ['4', '4', ESC, ESC, 'D'],  # NUMPAD 4 and LEFT ARROW
+        0x45: ['5', '5', '', ''],
+        # NUMPAD 6 and RIGHT ARROW
+        0x46: ['6', '6', ESC, ESC, 'C'],
+        0x4D: [CR, '', '', ''],  # ENTER
+        # ROW 4
+        # 0x57: ['', '', ''], #CTRL
+        0x0E: ['<', '>', '|', ''],
+        0x01: ['z', 'Z', '', chr(0x1A)],
+        0x02: ['x', 'X', '', chr(0x18)],
+        0x03: ['c', 'C', '', chr(0x03)],
+        0x04: ['v', 'V', '', chr(0x16)],
+        0x05: ['b', 'B', '', chr(0x02)],
+        0x06: ['n', 'N', '', chr(0x0E)],
+        0x07: ['m', 'M', '', CR],
+        0x08: [',', '<', '', ''],
+        0x09: ['.', '>', '', ''],
+        0x0A: ['/', '?', '', chr(0x1F)],
+        # 0x56: ['', '', ''], #ALT
+        0x0C: ['', '', '', ''],
+        0x41: ['1', '1', '', ''],
+        0x42: ['2', '2', ESC, ESC, 'B'],  # NUMPAD 2 and DOWN ARROW
+        0x43: ['3', '3', '', ''],
+        0x68: ['', '', '', ''],
+        0x40: ['0', '0', '', ''],
+        0x4A: [',', '', '', ''],
+        # ROW 5
+        0x0F: [' ', ' ', '', ''],  # SPACE BAR
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+        },
+    },
+
+    '5250_DE': {
+
+        # SPECIAL KEYS MAPPINGS
+        'CTRL_PRESS': [0x54],
+        'CTRL_RELEASE': [0xD4],
+        'ALT_PRESS': [0x68],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x57, 0x56],
+        'SHIFT_RELEASE': [0xD7, 0xD6],
+        'CAPS_LOCK': [0x7E],
+        'EXTRA': [],
+
+        # FUNCTION BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x7C: [ESC, ESC, '', ''],  # F1 as ESC
+        0x6F: [ESC, ESC, '', ''],  # F2 as ESC
+        # ROW 2
+        # 0x6C: ['', '', '', ''], #F3
+        # 0x6D: ['', '', '', ''], #F4
+        # ROW 3
+        # 0x6E: ['', '', '', ''], #F5
+        # 0x7D: ['', '', '', ''], #F6
+        # ROW 4
+        # 0x71: ['', '', '', ''], #F7
+        # 0x70: ['', '', '', ''], #F8
+        # ROW 5
+        # 0x72: ['', '', '', ''], #F9
+        # 0x73: ['', '', '', ''], #F10
+
+        # MAIN ALPHA AND NUMPAD BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x3E: ['^', '°', '′', ''],
+        0x31: ['1', '!', '¹', ''],
+        0x32: ['2', '"', '²', ''],
+        0x33: ['3', '§', '³', ''],
+        0x34: ['4', '$', '¼', ''],
+        0x35: ['5', '%', '½', ''],
+        0x36: ['6', '&', '¬', ''],
+        0x37: ['7', '/', '{', ''],
+        0x38: ['8', '(', '[', ''],
+        0x39: ['9', ')', ']', ''],
+        0x3A: ['0', '=', '}', ''],
+        0x3B: ['ß', '?', '\\', chr(0x1C)],
+        0x3C: ['´', '`', '¸', ''],
+        0x3D: [BS, BS, '', ''],  # BS
+        0x4B: ['', '', '', ''],
+        0x4C: ['', '', '', ''],  # DUP
+        # ROW 2
+        0x20: [TAB, TAB, '', ''],  # TAB
+        0x21: ['q', 'Q', '@', chr(0x11)],
+        0x22: ['w', 'W', 'ł', chr(0x17)],
+        0x23: ['e', 'E', '€', chr(0x05)],
+        0x24: ['r', 'R', '¶', chr(0x12)],
+        0x25: ['t', 'T', 'ŧ', chr(0x14)],
+        0x26: ['z', 'Z', '←', chr(0x19)],
+        0x27: ['u', 'U', '↓', chr(0x15)],
+        0x28: ['i', 'I', '→', TAB],
+        0x29: ['o', 'O', 'ø', chr(0x0F)],
+        0x2A: ['p', 'P', 'þ', chr(0x10)],
+        0x2B: ['ü', 'Ü', '¨', ESC],
+        0x2C: ['+', '*', '~', chr(0x1D)],
+        0x2D: [CR, CR, '', ''],  # ENTER
+        0x47: ['7', '7', '', ''],
+        0x48: ['8', '8', ESC, ESC, 'A'],  # NUMPAD 8 and UP ARROW
+        0x49: ['9', '9', '', ''],
+        0x4E: ['', '', '', ''],  # CAMPO-
+        # ROW 3
+        # 0x54: ['', '', ''], #SHIFT
+        0x11: ['a', 'A', 'æ', chr(0x01)],
+        0x12: ['s', 'S', 'ſ', chr(0x13)],
+        0x13: ['d', 'D', 'ð', chr(0x04)],
+        0x14: ['f', 'F', 'đ', chr(0x06)],
+        0x15: ['g', 'G', 'ŋ', chr(0x07)],
+        0x16: ['h', 'H', 'ħ', BS],
+        0x17: ['j', 'J', '.', chr(0x0A)],
+        0x18: ['k', 'K', 'ĸ', chr(0x0B)],
+        0x19: ['l', 'L', 'ł', chr(0x0C)],
+        0x1A: ['ö', 'Ö', '˝', ''],
+        0x1B: ['ä', 'Ä', '^', ESC],
+        0x1C: ['#', 'Ä', '’', chr(0x1D)],
+        0x44: ['4', '4', ESC, ESC, 'D'],  # NUMPAD 4 and LEFT ARROW
+        0x45: ['5', '5', '', ''],
+        # NUMPAD 6 and RIGHT ARROW
+        0x46: ['6', '6', ESC, ESC, 'C'],
+        0x4D: [CR, '', '', ''],  # ENTER
+        # ROW 4
+        # 0x57: ['', '', ''], #CTRL
+        0x0E: ['<', '>', '|', ''],
+        0x01: ['y', 'Y', '»', chr(0x1A)],
+        0x02: ['x', 'X', '«', chr(0x18)],
+        0x03: ['c', 'C', '¢', chr(0x03)],
+        0x04: ['v', 'V', '„', chr(0x16)],
+        0x05: ['b', 'B', '“”', chr(0x02)],
+        0x06: ['n', 'N', '”', chr(0x0E)],
+        0x07: ['m', 'M', 'µ', CR],
+        0x08: [',', ';', '·', ''],
+        0x09: ['.', ':', '…', ''],
+        0x0A: ['-', '_', '–', chr(0x1F)],
+        # 0x56: ['', '', ''], #ALT
+        0x0C: ['', '', '', ''],
+        0x41: ['1', '1', '', ''],
+        0x42: ['2', '2', ESC, ESC, 'B'],  # NUMPAD 2 and DOWN ARROW
+        0x43: ['3', '3', '', ''],
+        0x68: ['', '', '', ''],
+        0x40: ['0', '0', '', ''],
+        0x4A: [',', '', '', ''],
+        # ROW 5
+        0x0F: [' ', ' ', '', ''],  # SPACE BAR
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+        },
+    },
+
+    'ENHANCED_ES': {
+
+        # SPECIAL FUNCTION KEYS MAPPINGS
+        'CTRL_PRESS': [0x14],
+        'CTRL_RELEASE': [0x94],
+        'ALT_PRESS': [0x58],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x12, 0x59],
+        'SHIFT_RELEASE': [0x92, 0xD9],
+        'CAPS_LOCK': [0x11],
+        'EXTRA': [],
+
+        # ESC AND FUNCTION BLOCK KEYS MAPPINGS
+        # KEYS FROM LEFT TO RIGHT
+        0x08: [ESC, ESC, '', ''],  # ESC
+        # 0x07: ['', '', '', ''], #F1
+        # 0x0F: ['', '', '', ''], #F2
+        # 0x17: ['', '', '', ''], #F3
+        # 0x1F: ['', '', '', ''], #F4
+        # 0x27: ['', '', '', ''], #F5
+        # 0x2F: ['', '', '', ''], #F6
+        # 0x37: ['', '', '', ''], #F7
+        # 0x3F: ['', '', '', ''], #F8
+        # 0x47: ['', '', '', ''], #F9
+        # 0x4F: ['', '', '', ''], #F10
+        # 0x4F: ['', '', '', ''], #F11
+        # 0x5E: ['', '', '', ''], #F12
+
+        # MAIN ALPHA BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x0E: ['º', 'ª', '\\', ''],
+        0x16: ['1', '!', '|', ''],
+        0x1E: ['2', '"', '@', ''],
+        0x26: ['3', '·', '#', ''],
+        0x25: ['4', '$', '~', ''],
+        0x2E: ['5', '%', '½', ''],
+        0x36: ['6', '&', '', ''],
+        0x3D: ['7', '/', '', ''],
+        0x3E: ['8', '(', '', ''],
+        0x46: ['9', ')', '', ''],
+        0x45: ['0', '=', '', ''],
+        0x4E: ['\'', '?', '', chr(0x1C)],
+        0x55: ['¡', '¿', '', ''],
+        0x66: [BS, BS, '', ''],  # BS
+        # ROW 2
+        0x0D: [TAB, TAB, '', ''],  # TAB
+        0x15: ['q', 'Q', '', chr(0x11)],
+        0x1D: ['w', 'W', '', chr(0x17)],
+        0x24: ['e', 'E', '', chr(0x05)],
+        0x2D: ['r', 'R', '', chr(0x12)],
+        0x2C: ['t', 'T', '', chr(0x14)],
+        0x35: ['y', 'Y', '', chr(0x19)],
+        0x3C: ['u', 'U', '', chr(0x15)],
+        0x43: ['i', 'I', '', TAB],
+        0x44: ['o', 'O', '', chr(0x0F)],
+        0x4D: ['p', 'P', '', chr(0x10)],
+        0x5B: ['+', '*', ']', chr(0x1D)],
+        0x5A: [CR, CR, '', ''],  # ENTER
+        # ROW 3
+        0x1C: ['a', 'A', '', chr(0x01)],
+        0x1B: ['s', 'S', '', chr(0x13)],
+        0x23: ['d', 'D', '', chr(0x04)],
+        0x2B: ['f', 'F', '', chr(0x06)],
+        0x34: ['g', 'G', '', chr(0x07)],
+        0x33: ['h', 'H', '', BS],
+        0x3B: ['j', 'J', '', chr(0x0A)],
+        0x42: ['k', 'K', '', chr(0x0B)],
+        0x4B: ['l', 'L', '', chr(0x0C)],
+        0x4C: ['ñ', 'Ñ', '', ''],
+        0x52: ['´', '¨', '{', ESC],
+        0x5C: ['ç', 'Ç', '}', chr(0x1D)],
+        # ROW 4
+        0x13: ['<', '>', '|', ''],
+        0x1A: ['z', 'Z', '', chr(0x1A)],
+        0x22: ['x', 'X', '', chr(0x18)],
+        0x21: ['c', 'C', '', chr(0x03)],
+        0x2A: ['v', 'V', '', chr(0x16)],
+        0x32: ['b', 'B', '', chr(0x02)],
+        0x31: ['n', 'N', '', chr(0x0E)],
+        0x3A: ['m', 'M', '', CR],
+        0x41: [',', ';', '', ''],
+        0x49: ['.', ':', '', ''],
+        0x4A: ['-', '_', '', chr(0x1F)],
+        # ROW 5
+        0x29: [' ', ' ', '', ''],  # SPACE BAR
+
+        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # TBD
+
+        # ARROW KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        0x63: [ESC, ESC, ESC, '', 'A'],  # UP ARROW
+        0x61: [ESC, ESC, ESC, '', 'D'],  # LEFT ARROW
+        0x60: [ESC, ESC, ESC, '', 'B'],  # DOWN ARROW
+        0x6A: [ESC, ESC, ESC, '', 'C'],  # RIGHT ARROW
+
+        # NUMPAD KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x4A: ['/', '/', '', ''],
+        0x3E: ['*', '*', '', ''],
+        0x7F: ['-', '-', '', ''],
+        # ROW 2
+        0x6C: ['7', '7', '', ''],
+        # NUMPAD 8  EXTRA UP ARROW
+        0x75: ['8', '8', ESC, ESC, 'A'],
+        0x7D: ['9', '9', '', ''],
+        0x7B: ['+', '+', '', ''],
+        # ROW 3
+        # NUMPAD 4   EXTRA LEFT ARROW
+        0x6b: ['4', '4', ESC, ESC, 'D'],
+        0x73: ['5', '5', '', ''],
+        # NUMPAD 6 EXTRA RIGHT ARROW
+        0x74: ['6', '6', ESC, ESC, 'C'],
+        0x58: [CR, '', '', ''],  # ENTER,
+        # ROW 4
+        0x69: ['1', '1', '', ''],
+        # NUMPAD 2  EXTRA DOWN ARROW
+        0x72: ['2', '2', ESC, ESC, 'B'],
+        0x7A: ['3', '3', '', ''],
+        # ROW 5
+        0x70: ['0', '0', '', ''],
+        0x71: ['.', '', '', ''],
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+        },
+    },
+
+    'ENHANCED_DE': {
+
+        # ESC AND FUNCTION BLOCK KEYS MAPPINGS
+        # KEYS FROM LEFT TO RIGHT
+        'CTRL_PRESS': [0x14],
+        'CTRL_RELEASE': [0x94],
+        'ALT_PRESS': [0X58],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x12, 0x59],
+        'SHIFT_RELEASE': [0x92, 0xD9],
+        'CAPS_LOCK': [0x11],
+        'EXTRA': [],
+        0x08: [ESC, ESC, '', ''],  # ESC
+        # 0x07: ['', '', '', ''], #F1
+        # 0x0F: ['', '', '', ''], #F2
+        # 0x17: ['', '', '', ''], #F3
+        # 0x1F: ['', '', '', ''], #F4
+        # 0x27: ['', '', '', ''], #F5
+        # 0x2F: ['', '', '', ''], #F6
+        # 0x37: ['', '', '', ''], #F7
+        # 0x3F: ['', '', '', ''], #F8
+        # 0x47: ['', '', '', ''], #F9
+        # 0x4F: ['', '', '', ''], #F10
+        # 0x4F: ['', '', '', ''], #F11
+        # 0x5E: ['', '', '', ''], #F12
+        # TBD UP TO F24
+
+
+        # MAIN ALPHA BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x0E: ['^', '°', '′', ''],
+        0x16: ['1', '!', '¹', ''],
+        0x1E: ['2', '"', '²', ''],
+        0x26: ['3', '§', '³', ''],
+        0x25: ['4', '$', '¼', ''],
+        0x2E: ['5', '%', '½', ''],
+        0x36: ['6', '&', '¬', ''],
+        0x3D: ['7', '/', '{', ''],
+        0x3E: ['8', '(', '[', ''],
+        0x46: ['9', ')', ']', ''],
+        0x45: ['0', '=', '}', ''],
+        0x4E: ['ß', '?', '\\', chr(0x1C)],
+        0x55: ['´', '`', '¸', ''],
+        0x66: [BS, BS, '', ''],  # BS
+        # ROW 2
+        0x0D: [TAB, TAB, '', ''],  # TAB
+        0x15: ['q', 'Q', '@', chr(0x11)],
+        0x1D: ['w', 'W', 'ł', chr(0x17)],
+        0x24: ['e', 'E', '€', chr(0x05)],
+        0x2D: ['r', 'R', '¶', chr(0x12)],
+        0x2C: ['t', 'T', 'ŧ', chr(0x14)],
+        0x35: ['z', 'Z', '←', chr(0x19)],
+        0x3C: ['u', 'U', '↓', chr(0x15)],
+        0x43: ['i', 'I', '→', TAB],
+        0x44: ['o', 'O', 'ø', chr(0x0F)],
+        0x4D: ['p', 'P', 'þ', chr(0x10)],
+        0x5B: ['ü', 'Ü', '~', chr(0x1D)],
+        0x5A: [CR, CR, '', ''],  # ENTER
+        # ROW 3
+        0x1C: ['a', 'A', 'æ', chr(0x01)],
+        0x1B: ['s', 'S', 'ſ', chr(0x13)],
+        0x23: ['d', 'D', 'ð', chr(0x04)],
+        0x2B: ['f', 'F', 'đ', chr(0x06)],
+        0x34: ['g', 'G', 'ŋ', chr(0x07)],
+        0x33: ['h', 'H', 'ħ', BS],
+        0x3B: ['j', 'J', '.', chr(0x0A)],
+        0x42: ['k', 'K', 'ĸ', chr(0x0B)],
+        0x4B: ['l', 'L', 'ł', chr(0x0C)],
+        0x4C: ['ö', 'Ö', '˝', ''],
+        0x52: ['ä', 'Ä', '^', ESC],
+        0x5C: ['#', '\'', '’', chr(0x1D)],
+        # ROW 4
+        0x13: ['<', '>', '|', ''],
+        0x1A: ['y', 'Y', '»', chr(0x1A)],
+        0x22: ['x', 'X', '«', chr(0x18)],
+        0x21: ['c', 'C', '¢', chr(0x03)],
+        0x2A: ['v', 'V', '„', chr(0x16)],
+        0x32: ['b', 'B', '“”', chr(0x02)],
+        0x31: ['n', 'N', '”', chr(0x0E)],
+        0x3A: ['m', 'M', 'µ', CR],
+        0x41: [',', ';', '·', ''],
+        0x49: ['.', ':', '…', ''],
+        0x4A: ['-', '_', '–', chr(0x1F)],
+        # ROW 5
+        0x29: [' ', ' ', '', ''],  # SPACE BAR
+        0x2B: ['`', '^', '¨', ESC],
+
+        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # TBD
+
+        # ARROW KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        0x63: [ESC, ESC, ESC, '', 'A'],  # UP ARROW
+        0x61: [ESC, ESC, ESC, '', 'D'],  # LEFT ARROW
+        0x60: [ESC, ESC, ESC, '', 'B'],  # DOWN ARROW
+        0x6A: [ESC, ESC, ESC, '', 'C'],  # RIGHT ARROW
+
+        # NUMPAD KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x4A: ['/', '/', '', ''],
+        0x3E: ['*', '*', '', ''],
+        0x7F: ['-', '-', '', ''],
+        # ROW 2
+        0x6C: ['7', '7', '', ''],
+        # NUMPAD 8  EXTRA UP ARROW
+        0x75: ['8', '8', ESC, ESC, 'A'],
+        0x7D: ['9', '9', '', ''],
+        0x7B: ['+', '+', '', ''],
+        # ROW 3
+        # NUMPAD 4   EXTRA LEFT ARROW
+        0x6b: ['4', '4', ESC, ESC, 'D'],
+        0x73: ['5', '5', '', ''],
+        # NUMPAD 6 EXTRA RIGHT ARROW
+        0x74: ['6', '6', ESC, ESC, 'C'],
+        0x58: [CR, '', '', ''],  # ENTER,
+        # ROW 4
+        0x69: ['1', '1', '', ''],
+        # NUMPAD 2  EXTRA DOWN ARROW
+        0x72: ['2', '2', ESC, ESC, 'B'],
+        0x7A: ['3', '3', '', ''],
+        # ROW 5
+        0x70: ['0', '0', '', ''],
+        0x71: ['.', '', '', ''],
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+        },
+    },
+
+    '122KEY_DE': {
+
+        # SPECIAL FUNCTION KEYS MAPPINGS
+        'CTRL_PRESS': [0x54],
+        'CTRL_RELEASE': [0xD4],
+        'ALT_PRESS': [0x68],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x57, 0x56],
+        'SHIFT_RELEASE': [0xD7, 0xD6],
+        'CAPS_LOCK': [0x7E],  # Grdst
+        'EXTRA': [0x6F],
+
+        # LEFT FUNCTION KEYS MAPPINGS (F1-F10)
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x7C: [ESC, ESC, '', ''],  # ESC
+        # TBD UP TO F10
+
+        # TOP FUNCTION KEYS MAPPINGS (F1-F24)
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        # 0x31: ['', '', '', ''], #F1
+        # 0x32: ['', '', '', ''], #F2
+        # 0x33: ['', '', '', ''], #F3
+        # 0x34: ['', '', '', ''], #F4
+        # 0x35: ['', '', '', ''], #F5
+        # 0x36: ['', '', '', ''], #F6
+        # 0x37: ['', '', '', ''], #F7
+        # 0x38: ['', '', '', ''], #F8
+        # 0x38: ['', '', '', ''], #F9
+        # 0x3A: ['', '', '', ''], #F10
+        # 0x3B: ['', '', '', ''], #F11
+        # 0x3C: ['', '', '', ''], #F12
+        # TBD UP TO F24
+
+        # MAIN ALPHA BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x3E: ['^', '°', '′', ''],
+        0x31: ['1', '!', '¹', ''],
+        0x32: ['2', '"', '²', ''],
+        0x33: ['3', '§', '³', ''],
+        0x34: ['4', '$', '¼', ''],
+        0x35: ['5', '%', '½', ''],
+        0x36: ['6', '&', '¬', ''],
+        0x37: ['7', '/', '{', ''],
+        0x38: ['8', '(', '[', ''],
+        0x39: ['9', ')', ']', ''],
+        0x3A: ['0', '=', '}', ''],
+        0x3B: ['ß', '?', '\\', chr(0x1C)],
+        0x3C: ['´', '`', '¸', ''],
+        0x3D: [BS, BS, '', ''],  # BS
+        # ROW 2
+        0x20: [TAB, TAB, '', ''],  # TAB
+        0x21: ['q', 'Q', '@', chr(0x11)],
+        0x22: ['w', 'W', 'ł', chr(0x17)],
+        0x23: ['e', 'E', '€', chr(0x05)],
+        0x24: ['r', 'R', '¶', chr(0x12)],
+        0x25: ['t', 'T', 'ŧ', chr(0x14)],
+        0x26: ['z', 'Z', '←', chr(0x19)],
+        0x27: ['u', 'U', '↓', chr(0x15)],
+        0x28: ['i', 'I', '→', TAB],
+        0x29: ['o', 'O', 'ø', chr(0x0F)],
+        0x2A: ['p', 'P', 'þ', chr(0x10)],
+        0x2B: ['ü', 'Ü', '~', chr(0x1D)],
+        0x2C: ['+', '*', '~', chr(0x1D)],
+        0x2D: [CR, CR, '', ''],  # ENTER
+        # ROW 3
+        0x11: ['a', 'A', 'æ', chr(0x01)],
+        0x12: ['s', 'S', 'ſ', chr(0x13)],
+        0x13: ['d', 'D', 'ð', chr(0x04)],
+        0x14: ['f', 'F', 'đ', chr(0x06)],
+        0x15: ['g', 'G', 'ŋ', chr(0x07)],
+        0x16: ['h', 'H', 'ħ', BS],
+        0x17: ['j', 'J', '.', chr(0x0A)],
+        0x18: ['k', 'K', 'ĸ', chr(0x0B)],
+        0x19: ['l', 'L', 'ł', chr(0x0C)],
+        0x1A: ['ö', 'Ö', '˝', ''],
+        0x1B: ['ä', 'Ä', '^', ESC],
+        0x1C: ['#', '\'', '’', chr(0x1D)],
+        # ROW 4
+        0x0e: ['<', '>', '|', ''],
+        0x01: ['y', 'Y', '»', chr(0x1A)],
+        0x02: ['x', 'X', '«', chr(0x18)],
+        0x03: ['c', 'C', '¢', chr(0x03)],
+        0x04: ['v', 'V', '„', chr(0x16)],
+        0x05: ['b', 'B', '“”', chr(0x02)],
+        0x06: ['n', 'N', '”', chr(0x0E)],
+        0x07: ['m', 'M', 'µ', CR],
+        0x08: [',', ';', '·', ''],
+        0x09: ['.', ':', '…', ''],
+        0x0a: ['-', '_', '–', chr(0x1F)],
+        # ROW 5
+        0x0F: [' ', ' ', '', ''],  # SPACE BAR
+
+
+        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # TBD
+
+        # ARROW KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        0x71: [ESC, ESC, ESC, '', 'A'],  # UP ARROW
+        0x72: [ESC, ESC, ESC, '', 'D'],  # LEFT ARROW
+        # TBD CENTER ARROW
+        0x73: [ESC, ESC, ESC, '', 'C'],  # RIGHT ARROW
+        0x70: [ESC, ESC, ESC, '', 'B'],  # DOWN ARROW
+
+        # NUMPAD KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x4A: ['/', '/', '', ''],
+        0x3E: ['*', '*', '', ''],
+        0x7F: ['-', '-', '', ''],
+        # ROW 2
+        0x47: ['7', '7', '', ''],
+        # NUMPAD 8  EXTRA UP ARROW
+        0x48: ['8', '8', ESC, ESC, 'A'],
+        0x49: ['9', '9', '', ''],
+        0x7B: ['+', '+', '', ''],
+        # ROW 3
+        # NUMPAD 4   EXTRA LEFT ARROW
+        0x44: ['4', '4', ESC, ESC, 'D'],
+        0x45: ['5', '5', '', ''],
+        0x46: ['6', '6', '', '', 'C'],  # NUMPAD 6 EXTRA RIGHT ARROW
+        # ROW 4
+        0x41: ['1', '1', '', ''],
+        # NUMPAD 2  EXTRA DOWN ARROW
+        0x42: ['2', ESC, ESC, '', 'B'],
+        0x43: ['3', '3', '', ''],
+        0x2D: [CR, '', '', ''],  # ENTER
+        # ROW 5
+        0x40: ['0', '0', '', ''],
+        0x4A: ['.', '', '', ''],
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+        },
+    },
+
+    '122KEY_EN': {
+
+        # SPECIAL FUNCTION KEYS MAPPINGS
+        'CTRL_PRESS': [0x54],
+        'CTRL_RELEASE': [0xD4],
+        'ALT_PRESS': [0x68],
+        'ALT_RELEASE': [],
+        'SHIFT_PRESS': [0x57, 0x56],
+        'SHIFT_RELEASE': [0xD7, 0xD6],
+        'CAPS_LOCK': [0x7E],  # Reset
+        'EXTRA': [0x6F],
+
+        # LEFT FUNCTION KEYS MAPPINGS (F1-F10)
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x7C: [ESC, ESC, '', ''],  # ESC
+        # TBD UP TO F10
+
+        # MAIN ALPHA BLOCK KEYS MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1
+        0x3E: ['`', '~', '′', ''],
+        # F1 through F12 generate the following scan codes with an
+        # 0x6F prefix, so position 5 (EXTRA) is used for those keys.
+        # The escape sequences in position 5 correspond to the "xterm"
+        # terminfo entry's key_f1 through key_f12.  F13 through F24
+        # generate the same scan codes but with a shift key down/make
+        # scan code prefix; there is no way to specify handling of the
+        # combination of Shift + EXTRA.
+        0x31: ['1', '!', '¹', '',         None, 'OP'],
+        0x32: ['2', '@', '²', '',         None, 'OQ'],
+        0x33: ['3', '#', '³', '',         None, 'OR'],
+        0x34: ['4', '$', '¼', '',         None, 'OS'],
+        0x35: ['5', '%', '½', '',         None, '[15~'],
+        0x36: ['6', '^', '¬', chr(0x1E),  None, '[17~'],
+        0x37: ['7', '&', '{', '',         None, '[18~'],
+        0x38: ['8', '*', '[', '',         None, '[19~'],
+        0x39: ['9', '(', ']', '',         None, '[20~'],
+        0x3A: ['0', ')', '}', '',         None, '[21~'],
+        0x3B: ['-', '_', '\\', chr(0x1F), None, '[23~'],
+        0x3C: ['=', '+', '¸', '',         None, '[24~'],
+        0x3D: [BS, BS, '', ''],  # BS
+        # ROW 2
+        0x20: [TAB, TAB, '', ''],  # TAB
+        0x21: ['q', 'Q', '@', chr(0x11), None, 'q'],
+        0x22: ['w', 'W', 'ł', chr(0x17), None, 'w'],
+        0x23: ['e', 'E', '€', chr(0x05), None, 'e'],
+        0x24: ['r', 'R', '¶', chr(0x12), None, 'r'],
+        0x25: ['t', 'T', 'ŧ', chr(0x14), None, 't'],
+        0x26: ['y', 'Y', '←', chr(0x19), None, 'y'],
+        0x27: ['u', 'U', '↓', chr(0x15), None, 'u'],
+        0x28: ['i', 'I', '→', TAB, None, 'i'],
+        0x29: ['o', 'O', 'ø', chr(0x0F), None, 'o'],
+        0x2A: ['p', 'P', 'þ', chr(0x10), None, 'p'],
+        0x2B: ['[', ']', '~', chr(0x1D)],
+        0x2C: ['\\', '|', '~', chr(0x1C)],
+        0x2D: [CR, CR, '', ''],  # ENTER
+        # ROW 3
+        0x11: ['a', 'A', 'æ', chr(0x01), None, 'a'],
+        0x12: ['s', 'S', 'ſ', chr(0x13), None, 's'],
+        0x13: ['d', 'D', 'ð', chr(0x04), None, 'd'],
+        0x14: ['f', 'F', 'đ', chr(0x06), None, 'f'],
+        0x15: ['g', 'G', 'ŋ', chr(0x07), None, 'g'],
+        0x16: ['h', 'H', 'ħ', BS, None, 'h'],
+        0x17: ['j', 'J', '.', chr(0x0A), None, 'j'],
+        0x18: ['k', 'K', 'ĸ', chr(0x0B), None, 'k'],
+        0x19: ['l', 'L', 'ł', chr(0x0C), None, 'l'],
+        0x1A: [';', ':', '˝', ''],
+        0x1B: ['\'', '"', '^', ESC],
+        0x1C: ['{', '}', '’', chr(0x1D)],
+        # ROW 4
+        0x0e: ['<', '>', '|', ''],
+        0x01: ['z', 'Z', '»',  chr(0x1A), None, 'z'],
+        0x02: ['x', 'X', '«',  chr(0x18), None, 'x'],
+        0x03: ['c', 'C', '¢',  chr(0x03), None, 'c'],
+        0x04: ['v', 'V', '„',  chr(0x16), None, 'v'],
+        0x05: ['b', 'B', '“”', chr(0x02), None, 'b'],
+        0x06: ['n', 'N', '”',  chr(0x0E), None, 'n'],
+        0x07: ['m', 'M', 'µ',  CR, None, 'm'],
+        0x08: [',', '<', '·', '',         None, ','],
+        0x09: ['.', '>', '…', '',         None, '.'],
+        0x0a: ['/', '?', '–', chr(0x1F)],
+        # ROW 5
+        0x0F: [' ', ' ', '', chr(0x00)],  # SPACE BAR
+
+
+        # TEXT EDIT MODE KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        0x4b: [ESC, ESC, ESC, '', ''], #insert?
+        # 0x4c: [ESC, ESC, ESC, '', 'F'], # end works, DUP on kb
+        # 0x62: [ESC, ESC, ESC, '', ''], # blank
+        0xc: [ESC, ESC, ESC, '', DEL], # delete line
+        # 0x6c: [ESC, ESC, ESC, '', ''], #
+        # 0x57: [ESC, ESC, ESC, '', ''], #
+        # 0x6c
+
+        # ARROW KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        0x71: [ESC, ESC, ESC, '', 'A'],  # UP ARROW
+        0x72: [ESC, ESC, ESC, '', 'D'],  # LEFT ARROW
+        # TBD CENTER ARROW
+        0x73: [ESC, ESC, ESC, '', 'C'],  # RIGHT ARROW
+        0x70: [ESC, ESC, ESC, '', 'B'],  # DOWN ARROW
+
+        # NUMPAD KEYS BLOCK MAPPINGS
+        # KEYS FROM TOP TO BOTTOM AND FROM LEFT TO RIGHT
+        # ROW 1 (ALL BLANK)
+        # 0x1D is in the position of Num Lock on a 101 key keyboard,
+        # so do nothing with it
+        0x1E: ['/', '/', '', ''],
+        0x4F: ['*', '*', '', ''],
+        0x50: ['-', '-', '', ''],
+        # ROW 2
+        0x47: ['7', '7', '', ''],
+        # NUMPAD 8  EXTRA UP ARROW
+        0x48: ['8', '8', ESC, ESC, 'A'],
+        0x49: ['9', '9', '', ''],
+        0x7B: ['+', '+', '', ''],
+        # ROW 3
+        # NUMPAD 4   EXTRA LEFT ARROW
+        0x44: ['4', '4', ESC, ESC, 'D'],
+        0x45: ['5', '5', '', ''],
+        0x46: ['6', '6', '', '', 'C'],  # NUMPAD 6 EXTRA RIGHT ARROW
+        # ROW 4
+        0x41: ['1', '1', '', ''],
+        # NUMPAD 2  EXTRA DOWN ARROW
+        0x42: ['2', ESC, ESC, '', 'B'],
+        0x43: ['3', '3', '', ''],
+        0x2D: [CR, '', '', ''],  # ENTER
+        # ROW 5
+        0x40: ['0', '0', '', ''],
+        0x4A: ['.', '', '', ''],
+
+        # Custom character conversions, from ASCII char to EBCDIC code that
+        # will override the DEFAULT_CODEPAGE conversions
+        'CUSTOM_CHARACTER_CONVERSIONS': {
+        },
+    },
+
+    # ENTER HERE YOUR ADDITIONAL SCANCODE MAPPINGS
+
+}
+
+# Add a scancode mapping variant which requires use of the custom
+# terminfo file.
+#
+# Use dict() to make a copy.
+scancodeDictionaries["122KEY_EN_CUSTOM"] = dict(scancodeDictionaries["122KEY_EN"])
+# Send the delete character for the Backspace key as is done by most
+# modern terminals (e.g. xterm) rather than sending ^H.  This is
+# useful in GNU Emacs so that Ctrl-H can be used to request help.  See
+# also https://github.com/inmbolmie/5250_usb_converter/issues/19  As
+# noted in that issue, generally it doesn't seem to be necessary for
+# this to match what is set in the terminfo description - what is set
+# via 'stty' seems to be what matters - so it would probably be
+# reasonably safe to apply this setting directly to 122KEY_EN instead
+# of adding this new scancode map.
+scancodeDictionaries["122KEY_EN_CUSTOM"][0x3D] = [DEL, DEL, '', '']